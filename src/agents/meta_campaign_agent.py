@@ -4,9 +4,10 @@ Dynamic Meta Campaign Agent - Intelligent SDK usage
 import logging
 import re
 import json
-from typing import Dict, Any, Optional, List, Literal
+from typing import Dict, Any, Optional, List, Literal, Union
 from datetime import datetime
 
+import pandas as pd
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
@@ -15,7 +16,9 @@ from langchain_anthropic import ChatAnthropic
 from pydantic import BaseModel, Field
 
 from ..config.settings import get_settings
-from ..tools.meta_ads_tools import meta_sdk_query, meta_sdk_discover, intelligent_meta_query
+from ..tools.meta_ads_tools import (
+    meta_sdk_query, meta_sdk_discover, intelligent_meta_query, meta_sdk_batch_query_stream
+)
 
 logger = logging.getLogger(__name__)
 
@@ -86,7 +89,7 @@ class MetaCampaignState(MessagesState):
     query: Optional[str]
     time_period: Optional[str]
     location: Optional[str]
-    query_params: Optional[Dict]
+    query_params: Optional[Union[Dict, List[Dict]]]
     raw_data: Optional[Dict]
     answer: Optional[str]
     error: Optional[str]
@@ -141,6 +144,115 @@ def extract_location(query: str) -> Optional[str]:
     return None
 
 
+# Known city names, checked in order, for pulling a city out of an adset name
+_KNOWN_CITIES = (
+    'Brooklyn', 'LA', 'Los Angeles', 'Miami', 'Chicago',
+    'Houston', 'Dallas', 'New York', 'Atlanta', 'Orlando',
+    'Phoenix', 'San Diego', 'San Francisco', 'Boston',
+    'Seattle', 'Denver', 'Austin', 'Nashville', 'Portland'
+)
+
+# Word-boundary matching avoids partial matches
+_KNOWN_CITY_PATTERNS = tuple(
+    (city, re.compile(r'\b' + re.escape(city) + r'\b', re.IGNORECASE))
+    for city in _KNOWN_CITIES
+)
+
+_CITY_METRIC_COLUMNS = ['spend', 'impressions', 'clicks', 'purchases', 'revenue']
+
+
+def city_from_adset_name(adset_name: str) -> str:
+    """Extract the city from an adset name such as 'Sende Tour - Brooklyn'"""
+    # Smart extraction: Look for known city names in the string
+    for known_city, pattern in _KNOWN_CITY_PATTERNS:
+        if pattern.search(adset_name):
+            return known_city
+    
+    # If no known city found, use dash extraction as fallback
+    city_name = adset_name
+    if ' - ' in city_name:
+        # Split by ' - ' and take the last part
+        city_name = city_name.split(' - ')[-1].strip()
+    elif ':' in city_name:
+        # Also handle colon separators
+        city_name = city_name.split(':')[-1].strip()
+    
+    # Clean up any remaining tour/campaign references
+    return city_name.replace('Tour', '').strip()
+
+
+def _purchase_value(entries: Any, cast) -> float:
+    """Sum the 'purchase' entries of an actions / action_values list"""
+    if not isinstance(entries, list):
+        return 0
+    return sum(cast(float(entry.get('value', 0))) for entry in entries
+               if entry.get('action_type') == 'purchase')
+
+
+def _metric_frame(data: List[Dict], with_city: bool = False) -> pd.DataFrame:
+    """One typed row per insight: spend, impressions, clicks, purchases, revenue"""
+    rows = pd.DataFrame.from_records(
+        data, columns=['adset_name', 'spend', 'impressions', 'clicks', 'actions', 'action_values']
+    )
+    numeric = rows[['spend', 'impressions', 'clicks']].apply(pd.to_numeric).fillna(0)
+    
+    frame = pd.DataFrame({
+        'spend': numeric['spend'].astype('float64'),
+        'impressions': numeric['impressions'].astype('int64'),
+        'clicks': numeric['clicks'].astype('int64'),
+        'purchases': rows['actions'].map(lambda entries: _purchase_value(entries, int)).astype('int64'),
+        'revenue': rows['action_values'].map(lambda entries: _purchase_value(entries, float)).astype('float64'),
+    })
+    if with_city:
+        frame['city'] = rows['adset_name'].fillna('Unknown').map(city_from_adset_name)
+    return frame
+
+
+def total_metrics(data: List[Dict]) -> Dict[str, Any]:
+    """Spend, impressions, clicks, purchases and revenue summed over all rows"""
+    return _metric_frame(data).sum().to_dict()
+
+
+def aggregate_city_metrics(data: List[Dict]) -> pd.DataFrame:
+    """
+    Per-city spend, impressions, clicks, purchases, revenue and ROAS
+    
+    Adset rows are grouped by the city in their name. The frame is indexed by
+    city in first-seen order.
+    """
+    frame = _metric_frame(data, with_city=True)
+    city_metrics = frame.groupby('city', sort=False)[_CITY_METRIC_COLUMNS].sum()
+    spend = city_metrics['spend']
+    city_metrics['roas'] = (city_metrics['revenue'] / spend.where(spend > 0)).fillna(0)
+    return city_metrics
+
+
+# SECURITY: Block ALL proprietary information questions
+# Users can ONLY ask about performance metrics (sales, revenue, ROAS, etc.)
+_PROPRIETARY_KEYWORDS = (
+    # Targeting and audience
+    'interest', 'targeting', 'audience', 'demographic', 'behavior',
+    'custom audience', 'lookalike', 'retargeting',
+    # Technical details
+    'pixel', 'tracking', 'api', 'sdk', 'integration',
+    # Campaign structure
+    'how many ad', 'how many campaign', 'how many adset',
+    'number of ad', 'number of campaign', 'number of adset',
+    # Strategy and methods
+    'strategy', 'method', 'approach', 'technique', 'process',
+    'how do you', 'how are you', 'what are you using',
+    'why are you', 'explain how', 'show me how',
+    # Creative details
+    'creative', 'image', 'video', 'copy', 'headline',
+    # Internal details
+    'algorithm', 'formula', 'calculation', 'logic',
+    'internal', 'proprietary', 'secret', 'confidential'
+)
+
+# One alternation scans a query for every keyword in a single pass
+_PROPRIETARY_RE = re.compile('|'.join(map(re.escape, _PROPRIETARY_KEYWORDS)))
+
+
 async def parse_query_node(state: MetaCampaignState) -> Command:
     """Use AI to understand query and determine what SDK calls to make"""
     logger.info("Understanding user query")
@@ -157,39 +269,16 @@ async def parse_query_node(state: MetaCampaignState) -> Command:
     
     query_lower = query.lower()
     
-    # SECURITY: Block ALL proprietary information questions
-    # Users can ONLY ask about performance metrics (sales, revenue, ROAS, etc.)
-    proprietary_keywords = [
-        # Targeting and audience
-        'interest', 'targeting', 'audience', 'demographic', 'behavior',
-        'custom audience', 'lookalike', 'retargeting',
-        # Technical details
-        'pixel', 'tracking', 'api', 'sdk', 'integration',
-        # Campaign structure
-        'how many ad', 'how many campaign', 'how many adset',
-        'number of ad', 'number of campaign', 'number of adset',
-        # Strategy and methods
-        'strategy', 'method', 'approach', 'technique', 'process',
-        'how do you', 'how are you', 'what are you using',
-        'why are you', 'explain how', 'show me how',
-        # Creative details
-        'creative', 'image', 'video', 'copy', 'headline',
-        # Internal details
-        'algorithm', 'formula', 'calculation', 'logic',
-        'internal', 'proprietary', 'secret', 'confidential'
-    ]
-    
     # Check for proprietary information requests
-    for keyword in proprietary_keywords:
-        if keyword in query_lower:
-            logger.warning(f"Blocked proprietary query: {query}")
-            return Command(
-                update={
-                    'error': 'This information is proprietary to Outlet Media.',
-                    'messages': [AIMessage(content="This information is proprietary to Outlet Media. I can only provide performance metrics like sales, revenue, ROAS, spend, impressions, and clicks. What performance metrics would you like to see?")]
-                },
-                goto=END
-            )
+    if _PROPRIETARY_RE.search(query_lower):
+        logger.warning(f"Blocked proprietary query: {query}")
+        return Command(
+            update={
+                'error': 'This information is proprietary to Outlet Media.',
+                'messages': [AIMessage(content="This information is proprietary to Outlet Media. I can only provide performance metrics like sales, revenue, ROAS, spend, impressions, and clicks. What performance metrics would you like to see?")]
+            },
+            goto=END
+        )
     
     # Use AI to understand what the user wants
     settings = get_settings()
@@ -280,13 +369,16 @@ async def parse_query_node(state: MetaCampaignState) -> Command:
             "breakdowns": ["age", "gender"] (only if demographics requested),
             "reasoning": "brief explanation"
         }}
+        
+        If the user compares time periods (e.g. "today vs yesterday"), return a JSON
+        array with one such object per period instead.
         """
         
         response = await model.ainvoke([SystemMessage(content=prompt)])
         
         # Parse JSON from response
         import json
-        json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
+        json_match = re.search(r'\[\s*\{.*\}\s*\]|\{.*\}', response.content, re.DOTALL)
         if json_match:
             query_params = json.loads(json_match.group())
             logger.info(f"AI determined SDK params: {query_params}")
@@ -315,13 +407,35 @@ async def parse_query_node(state: MetaCampaignState) -> Command:
         update={
             'query': query,
             'query_params': query_params,
-            'time_period': query_params.get('date_preset', 'maximum'),
+            'time_period': _first_query(query_params).get('date_preset', 'maximum'),
             'location': None  # Could extract from query if needed
         },
         goto='execute_query'
     )
 
 
+def _first_query(query_params: Union[Dict, List[Dict]]) -> Dict:
+    """The lead query of a single query or a batch"""
+    if isinstance(query_params, list):
+        return query_params[0] if query_params else {}
+    return query_params
+
+
+def _merge_batch_results(results: List[Any], queries: List[Dict]) -> Command:
+    """Combine batch results into one data set, or stop on the first error"""
+    rows = []
+    for result in results:
+        if isinstance(result, dict) and result.get('error'):
+            return Command(update={'error': result['error']}, goto=END)
+        rows.extend(result if isinstance(result, list) else result.get('data', []))
+    
+    logger.info(f"Batch of {len(queries)} queries successful - {len(rows)} rows found")
+    return Command(
+        update={'raw_data': {'data': rows}, 'query_params': _first_query(queries)},
+        goto='format_response'
+    )
+
+
 async def execute_query_node(state: MetaCampaignState) -> Command:
     """Execute the Meta API query"""
     logger.info("Executing Meta API query")
@@ -334,6 +448,11 @@ async def execute_query_node(state: MetaCampaignState) -> Command:
         )
     
     try:
+        if isinstance(query_params, list):
+            # Several queries run side by side; each result is streamed as it lands
+            results = await meta_sdk_batch_query_stream.ainvoke({'queries': query_params})
+            return _merge_batch_results(results, query_params)
+        
         # Use the existing meta_sdk_query function
         result = meta_sdk_query.invoke({'query': query_params})
         
@@ -434,125 +553,48 @@ Be intelligent about understanding intent:
                 logger.info(f"Query Understanding: {understanding.dict()}")
                 
                 # Use AI decision for data analysis
-                if understanding.requires_city_data and 'adset_name' in str(data):
+                if understanding.requires_city_data and any('adset_name' in item for item in data):
                     # Process city-level data (adsets represent cities)
-                    city_metrics = {}
-                    
-                    for item in data:
-                        raw_adset_name = item.get('adset_name', 'Unknown')
-                        
-                        # INTELLIGENT CITY NAME EXTRACTION
-                        # Remove common prefixes like "Sende Tour - ", "Tour - ", etc.
-                        city_name = raw_adset_name
-                        
-                        # List of known city names for intelligent extraction
-                        known_cities = ['Brooklyn', 'LA', 'Los Angeles', 'Miami', 'Chicago', 
-                                       'Houston', 'Dallas', 'New York', 'Atlanta', 'Orlando',
-                                       'Phoenix', 'San Diego', 'San Francisco', 'Boston',
-                                       'Seattle', 'Denver', 'Austin', 'Nashville', 'Portland']
-                        
-                        # Smart extraction: Look for known city names in the string
-                        import re
-                        city_found = False
-                        for known_city in known_cities:
-                            # Use word boundary matching to avoid partial matches
-                            pattern = r'\b' + re.escape(known_city) + r'\b'
-                            if re.search(pattern, city_name, re.IGNORECASE):
-                                city_name = known_city
-                                city_found = True
-                                break
-                        
-                        # If no known city found, use dash extraction as fallback
-                        if not city_found:
-                            if ' - ' in city_name:
-                                # Split by ' - ' and take the last part
-                                city_name = city_name.split(' - ')[-1].strip()
-                            elif ':' in city_name:
-                                # Also handle colon separators
-                                city_name = city_name.split(':')[-1].strip()
-                            
-                            # Clean up any remaining tour/campaign references
-                            city_name = city_name.replace('Tour', '').strip()
-                        if city_name not in city_metrics:
-                            city_metrics[city_name] = {
-                                'spend': 0,
-                                'impressions': 0,
-                                'clicks': 0,
-                                'purchases': 0,
-                                'revenue': 0
-                            }
-                    
-                        # Aggregate metrics for each city
-                        city_metrics[city_name]['spend'] += float(item.get('spend', 0))
-                        city_metrics[city_name]['impressions'] += int(float(item.get('impressions', 0)))
-                        city_metrics[city_name]['clicks'] += int(float(item.get('clicks', 0)))
-                    
-                        # Extract purchases from actions
-                        if 'actions' in item and isinstance(item['actions'], list):
-                            for action in item['actions']:
-                                if action.get('action_type') == 'purchase':
-                                    city_metrics[city_name]['purchases'] += int(float(action.get('value', 0)))
-                    
-                        # Extract revenue from action_values
-                        if 'action_values' in item and isinstance(item['action_values'], list):
-                            for av in item['action_values']:
-                                if av.get('action_type') == 'purchase':
-                                    city_metrics[city_name]['revenue'] += float(av.get('value', 0))
-                
-                    # Calculate ROAS for each city
-                    for city in city_metrics:
-                        spend = city_metrics[city]['spend']
-                        revenue = city_metrics[city]['revenue']
-                        city_metrics[city]['roas'] = (revenue / spend) if spend > 0 else 0
+                    city_metrics = aggregate_city_metrics(data)
                 
                     # Find best performing city
-                    best_city = None
-                    best_metric = 0
-                    metric_name = 'sales'
-                
-                    if 'revenue' in query_lower or 'roas' in query_lower:
-                        # Sort by ROAS or revenue
-                        for city, metrics in city_metrics.items():
-                            if 'roas' in query_lower:
-                                if metrics['roas'] > best_metric:
-                                    best_metric = metrics['roas']
-                                    best_city = city
-                                    metric_name = 'ROAS'
-                            else:
-                                if metrics['revenue'] > best_metric:
-                                    best_metric = metrics['revenue']
-                                    best_city = city
-                                    metric_name = 'revenue'
+                    if 'roas' in query_lower:
+                        rank_by = 'roas'
+                    elif 'revenue' in query_lower:
+                        rank_by = 'revenue'
                     else:
                         # Default to sales/purchases
-                        for city, metrics in city_metrics.items():
-                            if metrics['purchases'] > best_metric:
-                                best_metric = metrics['purchases']
-                                best_city = city
-                                metric_name = 'sales'
+                        rank_by = 'purchases'
+                    
+                    best_city = None
+                    if not city_metrics.empty and city_metrics[rank_by].max() > 0:
+                        best_city = city_metrics[rank_by].idxmax()
                 
                     # Format response for city queries
                     if 'best' in query_lower or 'top' in query_lower:
                         if best_city:
-                            metrics = city_metrics[best_city]
-                            response = f"{best_city} is the best performing city\n"
-                            response += f"- Sales: {metrics['purchases']}\n"
-                            response += f"- Revenue: ${metrics['revenue']:,.2f}\n"
-                            response += f"- Spend: ${metrics['spend']:,.2f}\n"
-                            response += f"- ROAS: {metrics['roas']:.2f}x\n"
-                            response += f"- Clicks: {metrics['clicks']:,}\n"
-                            response += f"- Impressions: {metrics['impressions']:,}"
+                            metrics = city_metrics.to_dict('index')[best_city]
+                            response = "\n".join((
+                                f"{best_city} is the best performing city",
+                                f"- Sales: {metrics['purchases']}",
+                                f"- Revenue: ${metrics['revenue']:,.2f}",
+                                f"- Spend: ${metrics['spend']:,.2f}",
+                                f"- ROAS: {metrics['roas']:.2f}x",
+                                f"- Clicks: {metrics['clicks']:,}",
+                                f"- Impressions: {metrics['impressions']:,}"
+                            ))
                         else:
                             response = "No city performance data available."
                     else:
                         # Show all cities
-                        response = "City Performance:\n\n"
-                        sorted_cities = sorted(city_metrics.items(), key=lambda x: x[1]['purchases'], reverse=True)
-                        for city, metrics in sorted_cities:
-                            response += f"{city}:\n"
-                            response += f"- Sales: {metrics['purchases']}\n"
-                            response += f"- Revenue: ${metrics['revenue']:,.2f}\n"
-                            response += f"- ROAS: {metrics['roas']:.2f}x\n\n"
+                        sorted_cities = city_metrics.sort_values('purchases', ascending=False, kind='stable')
+                        response = "City Performance:\n\n" + "".join(
+                            f"{city}:\n"
+                            f"- Sales: {metrics['purchases']}\n"
+                            f"- Revenue: ${metrics['revenue']:,.2f}\n"
+                            f"- ROAS: {metrics['roas']:.2f}x\n\n"
+                            for city, metrics in sorted_cities.to_dict('index').items()
+                        )
                         
             except Exception as e:
                 logger.warning(f"Could not use structured reasoning: {e}")
@@ -562,29 +604,12 @@ Be intelligent about understanding intent:
             # Fallback logic if structured reasoning didn't work or wasn't city query
             if not understanding or not understanding.requires_city_data:
                 # Original aggregation for non-city queries
-                total_purchases = 0
-                total_revenue = 0
-                total_spend = 0
-                total_impressions = 0
-                total_clicks = 0
-                
-                for item in data:
-                    # Extract spend, impressions, clicks
-                    total_spend += float(item.get('spend', 0))
-                    total_impressions += int(float(item.get('impressions', 0)))
-                    total_clicks += int(float(item.get('clicks', 0)))
-                    
-                    # Extract purchases from actions
-                    if 'actions' in item and isinstance(item['actions'], list):
-                        for action in item['actions']:
-                            if action.get('action_type') == 'purchase':
-                                total_purchases += int(float(action.get('value', 0)))
-                    
-                    # Extract revenue from action_values
-                    if 'action_values' in item and isinstance(item['action_values'], list):
-                        for av in item['action_values']:
-                            if av.get('action_type') == 'purchase':
-                                total_revenue += float(av.get('value', 0))
+                totals = total_metrics(data)
+                total_purchases = int(totals['purchases'])
+                total_revenue = float(totals['revenue'])
+                total_spend = float(totals['spend'])
+                total_impressions = int(totals['impressions'])
+                total_clicks = int(totals['clicks'])
                 
                 # Now ask AI to format a nice response with the aggregated data
                 format_prompt = f"""
@@ -645,10 +670,11 @@ Be intelligent about understanding intent:
                 response = f"{impressions:,} impressions {time_period}"
             else:
                 # Generic response with key metrics
-                response = f"Metrics for {time_period}:\n"
-                for key, value in sorted(metrics.items())[:10]:
-                    if isinstance(value, float) and value > 0:
-                        response += f"- {key}: {value:,.2f}\n"
+                response = f"Metrics for {time_period}:\n" + "".join(
+                    f"- {key}: {value:,.2f}\n"
+                    for key, value in sorted(metrics.items())[:10]
+                    if isinstance(value, float) and value > 0
+                )
         
     
     return Command(
@@ -3,6 +3,7 @@ Supervisor Agent - Orchestrates Meta Ads and GoHighLevel Agents
 Routes requests to appropriate agents and manages handoffs
 """
 import os
+import re
 import json
 import logging
 from typing import Dict, Any, Optional, List, Literal, TypedDict, Annotated
@@ -20,6 +21,10 @@ import asyncio
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Compiled once - used on every intent analysis / security check
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+_PHONE_PUNCTUATION_RE = re.compile(r'[\s\(\)\-]')
+
 
 class SupervisorState(TypedDict):
     """State for the supervisor agent"""
@@ -137,8 +142,7 @@ class IntentAnalyzer:
         response = await self.model.ainvoke([SystemMessage(content=prompt)])
         
         # Parse JSON from response
-        import re
-        json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
+        json_match = _JSON_OBJECT_RE.search(response.content)
         if json_match:
             return json.loads(json_match.group())
         
@@ -554,12 +558,11 @@ async def validate_security_node(state: SupervisorState) -> Command[Literal["sup
     
     # In production, validate through security agent
     from src.agents.security_agent import validate_access
-    import re
     
     # Normalize phone number format before validation
     if phone_number:
         # Remove spaces, parentheses, dashes from phone
-        normalized_phone = re.sub(r'[\s\(\)\-]', '', phone_number)
+        normalized_phone = _PHONE_PUNCTUATION_RE.sub('', phone_number)
         if not normalized_phone.startswith('+'):
             normalized_phone = '+' + normalized_phone
         logger.info(f"Supervisor normalized phone from '{phone_number}' to '{normalized_phone}'")
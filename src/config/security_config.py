@@ -3,7 +3,8 @@ Security Configuration for Multi-Agent System
 Only authorized phone numbers can access the system
 """
 import os
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional
 from datetime import datetime
 
 # Security Configuration
@@ -266,35 +267,47 @@ def get_rate_limit(role: str) -> Dict[str, int]:
     )
 
 
+# Access sets - _ALL_CAMPAIGNS is a sentinel compared by identity
+_ALL_CAMPAIGNS: FrozenSet[str] = frozenset({"*"})
+_NO_CAMPAIGNS: FrozenSet[str] = frozenset()
+
+
+def _campaign_access_sets() -> Dict[str, FrozenSet[str]]:
+    """Map each whitelisted phone to the campaign IDs it can access"""
+    access = {}
+    for user_data in SECURITY_CONFIG["whitelist"].values():
+        allowed = user_data.get("allowed_campaigns", [])
+        # First entry for a phone wins, like the whitelist scans above
+        access.setdefault(
+            user_data["phone"],
+            _ALL_CAMPAIGNS if "*" in allowed else frozenset(allowed)
+        )
+    return access
+
+
+_CAMPAIGN_ACCESS = _campaign_access_sets()
+
+
 def get_allowed_campaigns(phone: str) -> List[str]:
     """Get list of campaign IDs this phone number can access"""
-    for user_data in SECURITY_CONFIG["whitelist"].values():
-        if user_data["phone"] == phone:
-            allowed = user_data.get("allowed_campaigns", [])
-            if "*" in allowed:
-                return ["*"]  # Access to all campaigns
-            return allowed
-    return []  # No access by default
+    allowed = _CAMPAIGN_ACCESS.get(phone, _NO_CAMPAIGNS)
+    if allowed is _ALL_CAMPAIGNS:
+        return ["*"]  # Access to all campaigns
+    return sorted(allowed)
 
 
 def can_access_campaign(phone: str, campaign_id: str) -> bool:
     """Check if a phone number can access a specific campaign"""
-    allowed_campaigns = get_allowed_campaigns(phone)
-    
-    # Check if user has access to all campaigns
-    if "*" in allowed_campaigns:
-        return True
-    
-    # Check if specific campaign is in allowed list
-    return campaign_id in allowed_campaigns
+    allowed_campaigns = _CAMPAIGN_ACCESS.get(phone, _NO_CAMPAIGNS)
+    return allowed_campaigns is _ALL_CAMPAIGNS or campaign_id in allowed_campaigns
 
 
 def filter_campaigns_by_access(phone: str, campaigns: List[Dict]) -> List[Dict]:
     """Filter a list of campaigns to only those the user can access"""
-    allowed = get_allowed_campaigns(phone)
+    allowed = _CAMPAIGN_ACCESS.get(phone, _NO_CAMPAIGNS)
     
     # If user has access to all campaigns
-    if "*" in allowed:
+    if allowed is _ALL_CAMPAIGNS:
         return campaigns
     
     # Filter to only allowed campaigns
@@ -307,6 +320,7 @@ def filter_campaigns_by_access(phone: str, campaigns: List[Dict]) -> List[Dict]:
     return filtered
 
 
+@lru_cache(maxsize=256)
 def get_campaign_access_level(phone: str) -> str:
     """Get the campaign access level for a phone number"""
     for user_data in SECURITY_CONFIG["whitelist"].values():
@@ -4,9 +4,14 @@ Provides intelligent, flexible access to all Meta APIs
 The AI agent can dynamically call any endpoint and fetch any data
 """
 import os
+import copy
 import json
 import logging
 import asyncio
+import random
+import time
+from functools import cached_property, lru_cache
+from itertools import islice
 from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List, Union
 from datetime import datetime, timedelta
@@ -30,9 +35,100 @@ from facebook_business.adobjects.customaudience import CustomAudience
 from facebook_business.adobjects.adspixel import AdsPixel
 from facebook_business.exceptions import FacebookRequestError
 
+# orjson is optional - fall back to the stdlib encoder when it isn't installed
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode()
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2, default=str)
+    
+    _loads = json.loads
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Graph API error codes that mean "throttled", not "bad request"
+_RATE_LIMIT_ERROR_CODES = frozenset({4, 17, 32, 613, 80004})
+_RATE_LIMIT_MAX_ATTEMPTS = 3
+
+# Seconds meta_sdk_query waits for a query before giving up on it
+_QUERY_TIMEOUT = 30
+
+# Seconds a query may spend backing off before its last retry starts. This leaves
+# room inside _QUERY_TIMEOUT for the retried call; longer pauses are handed back
+# to the caller as rate_limited
+_RATE_LIMIT_BACKOFF_BUDGET = 20
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Whether an exception is a Graph API throttling error"""
+    return isinstance(error, FacebookRequestError) and error.api_error_code() in _RATE_LIMIT_ERROR_CODES
+
+
+def _rate_limit_wait(error: FacebookRequestError, attempt: int) -> float:
+    """
+    Seconds to wait before retrying a throttled call
+    
+    Jittered exponential backoff, stretched to Retry-After or the business
+    use case estimated_time_to_regain_access when Meta reports either.
+    """
+    wait = 2 ** attempt + random.uniform(0, 1)
+    headers = {k.lower(): v for k, v in (error.http_headers() or {}).items()}
+    
+    try:
+        wait = max(wait, float(headers.get('retry-after', 0)))
+    except (TypeError, ValueError):
+        pass
+    
+    try:
+        usage = json.loads(headers.get('x-business-use-case-usage') or '{}')
+        for entries in usage.values():
+            for entry in entries:
+                # Meta reports this one in minutes
+                wait = max(wait, 60 * float(entry.get('estimated_time_to_regain_access', 0)))
+    except (TypeError, ValueError, AttributeError):
+        pass
+    
+    return wait
+
+
+# Insights parameters that may be given flat on a query or nested under "params"
+_API_PARAM_KEYS = frozenset({
+    'date_preset', 'time_range', 'time_increment', 'level', 'limit',
+    'breakdowns', 'filtering', 'action_attribution_windows'
+})
+
+
+def _normalize_query(query: Dict[str, Any]) -> tuple:
+    """
+    Split a query into (top_level_fields, api_params)
+    
+    Flat API params win over nested ones; empty values are dropped so a
+    falsy flat value still falls back to its nested counterpart.
+    """
+    fields: Dict[str, Any] = {}
+    api_params: Dict[str, Any] = {}
+    
+    nested = query.get("params")
+    if isinstance(nested, dict):
+        for key, value in nested.items():
+            if key in _API_PARAM_KEYS and value:
+                api_params[key] = value
+    
+    for key, value in query.items():
+        if key in _API_PARAM_KEYS:
+            if value:
+                api_params[key] = value
+        elif key != "params":
+            fields[key] = value
+    
+    return fields, api_params
+
 
 class DynamicMetaSDK:
     """
@@ -80,6 +176,16 @@ class DynamicMetaSDK:
             temperature=0
         ) if os.getenv("OPENAI_API_KEY") else None
     
+    @cached_property
+    def account(self) -> AdAccount:
+        """
+        AdAccount handle for the configured account, built once
+        
+        The handle binds the API session current at first use; drop it with
+        `del meta_sdk.account` after re-initializing FacebookAdsApi.
+        """
+        return AdAccount(self._account_id_formatted)
+    
     def set_user_context(self, phone_number: str):
         """Set the current user context for security filtering"""
         self.current_user_phone = phone_number
@@ -91,10 +197,7 @@ class DynamicMetaSDK:
         if not self.current_user_phone:
             return True  # No security context set, allow for backward compatibility
         
-        if "*" in self.allowed_campaigns:
-            return True  # User has access to all campaigns
-        
-        return campaign_id in self.allowed_campaigns
+        return can_access_campaign(self.current_user_phone, campaign_id)
     
     def get_api_object(self, object_type: str, object_id: str) -> Any:
         """
@@ -172,6 +275,8 @@ class DynamicMetaSDK:
                 return obj.export_all_data()
                 
         except FacebookRequestError as e:
+            if _is_rate_limited(e):
+                raise  # execute_query backs off and retries
             logger.error(f"Facebook API error: {e}")
             return {"error": str(e), "error_code": e.api_error_code()}
         except Exception as e:
@@ -216,8 +321,7 @@ class DynamicMetaSDK:
         
         response = await self.llm.ainvoke(prompt)
         try:
-            import json
-            return json.loads(response.content)
+            return _loads(response.content)
         except:
             return {"operation": "get_campaign_insights", "date_preset": "last_30d"}
     
@@ -236,86 +340,82 @@ class DynamicMetaSDK:
                   }
         
         Returns:
-            Query results
+            Query results. Throttled calls are retried with backoff; if Meta
+            keeps throttling, or the next wait would overrun the backoff budget,
+            {"error": "rate_limited", "retry_after": N} is returned so the caller
+            can back off too.
         """
+        deadline = time.monotonic() + _RATE_LIMIT_BACKOFF_BUDGET
+        for attempt in range(1, _RATE_LIMIT_MAX_ATTEMPTS + 1):
+            try:
+                return self._dispatch_query(query)
+            except FacebookRequestError as e:
+                if not _is_rate_limited(e):
+                    raise
+                wait = _rate_limit_wait(e, attempt)
+                if attempt == _RATE_LIMIT_MAX_ATTEMPTS or time.monotonic() + wait > deadline:
+                    logger.warning(f"Rate limited by Meta (code {e.api_error_code()}), giving up; retry after {wait:.0f}s")
+                    return {"error": "rate_limited", "retry_after": int(wait), "error_code": e.api_error_code()}
+                logger.warning(f"Rate limited by Meta (code {e.api_error_code()}), retrying in {wait:.1f}s")
+                time.sleep(wait)
+    
+    def _dispatch_query(self, query: Dict[str, Any]) -> Any:
+        """Route a query to the method for its operation"""
         operation = query.get("operation", "fetch")
         
+        # CRITICAL FIX: Handle both flat and nested params structure
+        # The AI might generate {"params": {"date_preset": "today"}} or {"date_preset": "today"}
+        fields, api_params = _normalize_query(query)
+        
         if operation == "get_campaign_insights":
             # Handle case where campaign_id might be in object_id
-            campaign_id = query.get("campaign_id") or query.get("object_id")
-            
-            # CRITICAL FIX: Handle both flat and nested params structure
-            date_preset = query.get("date_preset")
-            if not date_preset and "params" in query and isinstance(query["params"], dict):
-                date_preset = query["params"].get("date_preset")
-            if not date_preset:
-                date_preset = "maximum"  # Default to maximum for all-time data
-            
-            breakdowns = query.get("breakdowns")
-            if not breakdowns and "params" in query and isinstance(query["params"], dict):
-                breakdowns = query["params"].get("breakdowns")
-            
-            time_increment = query.get("time_increment")
-            if not time_increment and "params" in query and isinstance(query["params"], dict):
-                time_increment = query["params"].get("time_increment")
+            campaign_id = fields.get("campaign_id") or fields.get("object_id")
+            date_preset = api_params.get("date_preset", "maximum")  # Default to maximum for all-time data
+            breakdowns = api_params.get("breakdowns")
             
             if not campaign_id:
                 # If no specific campaign, get all campaigns insights
                 return self.get_all_campaigns_insights(
                     date_preset,
-                    query.get("fields"),
+                    fields.get("fields"),
                     breakdowns
                 )
             return self.get_campaign_insights_dynamic(
                 campaign_id,
                 date_preset,
-                query.get("fields"),
+                fields.get("fields"),
                 breakdowns,
-                time_increment
+                api_params.get("time_increment")
             )
         
         elif operation == "get_all_campaigns":
             return self.get_all_campaigns(
-                query.get("fields"),
-                query.get("filtering"),
-                query.get("limit", 100)
+                fields.get("fields"),
+                api_params.get("filtering"),
+                api_params.get("limit", 100)
             )
         
         elif operation == "get_audience_insights":
             return self.get_audience_insights(
-                query.get("object_id"),
-                query.get("object_type", "campaign")
+                fields.get("object_id"),
+                fields.get("object_type", "campaign")
             )
         
         elif operation == "get_adsets_insights":
             # Fetch insights for all adsets in a campaign
             # Handle case where campaign_id might be in object_id
-            campaign_id = query.get("campaign_id") or query.get("object_id")
+            campaign_id = fields.get("campaign_id") or fields.get("object_id")
             if not campaign_id:
                 return {"error": "No campaign_id provided for adsets insights"}
             
-            # CRITICAL FIX: Handle both flat and nested date_preset
-            # The AI might generate {"params": {"date_preset": "today"}} or {"date_preset": "today"}
-            date_preset = query.get("date_preset")
-            if not date_preset and "params" in query and isinstance(query["params"], dict):
-                date_preset = query["params"].get("date_preset")
-            if not date_preset:
-                date_preset = "maximum"  # Default to maximum instead of today
-                
+            date_preset = api_params.get("date_preset", "maximum")  # Default to maximum instead of today
             logger.info(f"get_adsets_insights called with date_preset: {date_preset}")
             
-            # Similarly handle level from params if present
-            level = query.get("level")
-            if not level and "params" in query and isinstance(query["params"], dict):
-                level = query["params"].get("level")
-            if not level:
-                level = "adset"
-                
             return self.get_adsets_insights(
                 campaign_id,
                 date_preset,
-                query.get("fields"),
-                level
+                fields.get("fields"),
+                api_params.get("level", "adset")
             )
         
         elif operation == "custom_query":
@@ -373,6 +473,8 @@ class DynamicMetaSDK:
             insights = campaign.get_insights(fields=fields, params=params)
             return [insight.export_all_data() for insight in insights]
         except Exception as e:
+            if _is_rate_limited(e):
+                raise
             logger.error(f"Error getting campaign insights: {e}")
             return {"error": str(e), "message": "Failed to fetch campaign insights"}
     
@@ -390,7 +492,7 @@ class DynamicMetaSDK:
             if not self.access_token:
                 return {"error": "No Meta access token configured"}
             
-            account = AdAccount(self._account_id_formatted)
+            account = self.account
             
             if not fields:
                 fields = [
@@ -408,12 +510,12 @@ class DynamicMetaSDK:
             
             # Filter by allowed campaigns if security context is set
             if self.current_user_phone:
-                if "*" not in self.allowed_campaigns:
-                    # Filter to only allowed campaigns
-                    all_campaigns = [c for c in all_campaigns if c.get('id') in self.allowed_campaigns]
+                all_campaigns = filter_campaigns_by_access(self.current_user_phone, all_campaigns)
             
             return all_campaigns
         except Exception as e:
+            if _is_rate_limited(e):
+                raise
             logger.error(f"Error getting campaigns: {e}")
             return {"error": str(e), "message": "Failed to fetch campaigns from Meta API"}
     
@@ -493,6 +595,8 @@ class DynamicMetaSDK:
                         all_insights.append(insight_data)
                         
                 except Exception as e:
+                    if _is_rate_limited(e):
+                        raise
                     logger.warning(f"Error getting insights for adset {adset.get('id', 'unknown')}: {str(e)}")
                     continue
             
@@ -500,6 +604,8 @@ class DynamicMetaSDK:
             return all_insights
             
         except Exception as e:
+            if _is_rate_limited(e):
+                raise
             logger.error(f"Error getting adsets insights: {str(e)}", exc_info=True)
             return []
     
@@ -551,12 +657,16 @@ class DynamicMetaSDK:
                             insight_data['campaign_name'] = campaign.get('name', 'Unknown')
                             all_insights.append(insight_data)
                 except Exception as e:
+                    if _is_rate_limited(e):
+                        raise
                     logger.warning(f"Error getting insights for campaign {campaign_id}: {e}")
                     continue
             
             return all_insights
             
         except Exception as e:
+            if _is_rate_limited(e):
+                raise
             logger.error(f"Error getting all campaigns insights: {e}")
             return {"error": str(e), "message": "Failed to fetch campaigns insights"}
     
@@ -838,17 +948,16 @@ def meta_sdk_query(query: Dict[str, Any]) -> Any:
     Returns:
         The requested data from Meta Ads API
     """
-    logger.info(f"meta_sdk_query called with: {json.dumps(query, indent=2)}")
+    logger.info(f"meta_sdk_query called with: {_dumps(query)}")
     
     try:
         # Check if we're in an async context (LangGraph Studio)
         loop = asyncio.get_event_loop()
         if loop.is_running():
-            # We're in an async context - run in thread pool to avoid blocking
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(meta_sdk.execute_query, query)
-                result = future.result(timeout=30)  # Increased timeout to 30 seconds
+            # We're in an async context - run on the shared pool so a timeout
+            # returns now instead of waiting for the worker on pool shutdown
+            future = DynamicMetaSDK._executor.submit(meta_sdk.execute_query, query)
+            result = future.result(timeout=_QUERY_TIMEOUT)
         else:
             # Normal sync execution
             result = meta_sdk.execute_query(query)
@@ -894,14 +1003,203 @@ async def intelligent_meta_query(request: str) -> Any:
         query = await meta_sdk.understand_request(request)
         logger.info(f"Understood as: {query}")
         
-        # Execute the query
-        result = meta_sdk.execute_query(query)
+        # Execute the query off the event loop - rate limit backoff sleeps
+        result = await asyncio.to_thread(meta_sdk.execute_query, query)
         return result
     except Exception as e:
         logger.error(f"Error in intelligent query: {e}")
         return {"error": str(e)}
 
 
+# Common fields for different object types, used by meta_sdk_discover
+_DISCOVER_FIELD_MAPPING = {
+    "campaign": {
+        "fields": [
+            "name", "objective", "status", "effective_status", "daily_budget",
+            "lifetime_budget", "spend_cap", "created_time", "start_time", "stop_time",
+            "bid_strategy", "budget_optimization", "source_campaign_id"
+        ],
+        "edges": ["insights", "ads", "adsets", "ads_pixels", "copies"],
+        "insights_fields": [
+            # Basic metrics
+            "impressions", "clicks", "ctr", "cpc", "cpm", "cpp", "spend", "reach",
+            "frequency", "unique_clicks", "unique_ctr", "cost_per_unique_click",
+            
+            # Conversion metrics
+            "conversions", "conversion_rate", "cost_per_conversion", 
+            "purchase_roas", "website_purchase_roas", "mobile_app_purchase_roas",
+            
+            # Action metrics
+            "actions", "action_values", "cost_per_action_type", "unique_actions",
+            "website_ctr", "website_clicks", "deeplink_clicks", "app_store_clicks",
+            
+            # Video metrics
+            "video_views", "video_p25_watched_actions", "video_p50_watched_actions",
+            "video_p75_watched_actions", "video_p95_watched_actions", "video_p100_watched_actions",
+            "video_avg_time_watched_actions", "video_play_actions", "video_thruplay_watched_actions",
+            "cost_per_thruplay", "video_15s_watched_actions", "video_30_sec_watched_actions",
+            
+            # Engagement metrics
+            "engagement", "post_engagement", "page_engagement", "post_reactions",
+            "post_comments", "post_shares", "post_saves", "photo_views", "link_clicks",
+            "landing_page_views", "instant_experience_clicks_to_open", "instant_experience_clicks_to_start",
+            
+            # Lead metrics
+            "leads", "cost_per_lead", "lead_form_opens", "lead_form_views",
+            
+            # E-commerce metrics
+            "adds_to_cart", "adds_to_wishlist", "checkouts_initiated", "payment_info_added",
+            "purchases", "omni_purchases", "website_purchases", "in_app_purchases",
+            "offline_purchases", "catalog_segment_actions", "catalog_segment_value",
+            "catalog_segment_value_mobile_purchase_roas", "catalog_segment_value_omni_purchase_roas",
+            "catalog_segment_value_website_purchase_roas",
+            
+            # App metrics
+            "app_installs", "app_use", "app_activations", "app_registrations",
+            "app_sessions", "app_adds_to_cart", "app_adds_to_wishlist", "app_checkouts_initiated",
+            "app_content_views", "app_custom_events", "app_purchases", "app_ratings",
+            "app_achievement_unlocked", "app_tutorial_completed",
+            
+            # Store metrics
+            "store_location_page_views", "store_directions", "store_locator_searches",
+            
+            # Quality and relevance metrics
+            "quality_ranking", "engagement_rate_ranking", "conversion_rate_ranking",
+            "inline_link_clicks", "inline_link_click_ctr", "inline_post_engagement",
+            "unique_inline_link_clicks", "unique_inline_link_click_ctr",
+            
+            # Attribution metrics
+            "estimated_ad_recallers", "estimated_ad_recall_rate", "cost_per_estimated_ad_recaller",
+            "reach_frequency", "full_view_impressions", "full_view_reach",
+            
+            # Advanced metrics
+            "social_spend", "dda_countby_convs", "dda_results", "canvas_avg_view_percent",
+            "canvas_avg_view_time", "outbound_clicks", "outbound_clicks_ctr",
+            "unique_outbound_clicks", "unique_outbound_clicks_ctr"
+        ],
+        "breakdowns": [
+            "age", "gender", "country", "region", "dma", "device_platform",
+            "publisher_platform", "platform_position", "impression_device"
+        ]
+    },
+    "adset": {
+        "fields": [
+            "name", "status", "effective_status", "daily_budget", "lifetime_budget",
+            "bid_strategy", "optimization_goal", "billing_event", "targeting",
+            "promoted_object", "attribution_spec"
+        ],
+        "edges": ["insights", "ads", "activities", "delivery_estimate"],
+        "insights_fields": ["impressions", "clicks", "spend", "conversions"]
+    },
+    "ad": {
+        "fields": [
+            "name", "status", "effective_status", "creative", "bid_type",
+            "bid_amount", "targeting", "tracking_specs", "conversion_specs"
+        ],
+        "edges": ["insights", "creatives", "previews", "leads"],
+        "insights_fields": ["impressions", "clicks", "spend", "actions"]
+    },
+    "adaccount": {
+        "fields": [
+            "name", "account_status", "currency", "timezone_name", "spend_cap",
+            "amount_spent", "balance", "business", "capabilities"
+        ],
+        "edges": [
+            "campaigns", "adsets", "ads", "insights", "users", "custom_audiences",
+            "pixels", "applications", "businesses"
+        ]
+    }
+}
+
+def _ttl_get(cache: Dict[Any, tuple], key: Any, default: Any = None) -> Any:
+    """Value stored under key in a TTL cache, or default if absent or expired"""
+    entry = cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return default
+
+
+def _ttl_put(cache: Dict[Any, tuple], key: Any, value: Any, ttl: float, max_size: int) -> None:
+    """Store value for ttl seconds; a full cache drops expired entries first, then the oldest"""
+    now = time.monotonic()
+    if key not in cache and len(cache) >= max_size:
+        for stale in [k for k, (expires, _) in cache.items() if expires <= now]:
+            del cache[stale]
+        if len(cache) >= max_size:
+            del cache[next(iter(cache))]
+    cache[key] = (now + ttl, value)
+
+
+# Object metadata fetched by meta_sdk_discover, keyed on (object_type, object_id)
+_DISCOVER_OBJECT_TTL = 300  # seconds
+_DISCOVER_OBJECT_CACHE_SIZE = 256
+_discover_object_cache: Dict[tuple, tuple] = {}
+
+# Objects the Graph API recently reported as nonexistent, so repeat probes skip the call
+_DISCOVER_MISSING_TTL = 120  # seconds
+_DISCOVER_MISSING_CACHE_SIZE = 256
+_discover_missing_cache: Dict[tuple, tuple] = {}
+
+
+def _is_not_found(error: FacebookRequestError) -> bool:
+    """Whether a Graph API error says the object does not exist"""
+    code = error.api_error_code()
+    return (
+        error.http_status() == 404
+        or code == 803  # unknown alias
+        or (code == 100 and error.api_error_subcode() == 33)  # nonexisting object
+    )
+
+
+@lru_cache(maxsize=32)
+def _discover_static(object_type: str) -> Dict:
+    """Build the static discovery payload for an object type"""
+    info = _DISCOVER_FIELD_MAPPING.get(object_type.lower(), {})
+    return {
+        "object_type": object_type,
+        "available_fields": info.get("fields", []),
+        "available_edges": info.get("edges", []),
+        "insights_fields": info.get("insights_fields", []),
+        "breakdowns": info.get("breakdowns", []),
+        "description": f"Use meta_sdk_query to fetch any of these fields or edges for {object_type}"
+    }
+
+
+def _discover_object(object_type: str, object_id: str) -> Dict:
+    """Read id/name for a specific object, cached for a few minutes"""
+    key = (object_type.lower(), object_id)
+    cached = _ttl_get(_discover_object_cache, key)
+    if cached is not None:
+        return cached
+    
+    if _ttl_get(_discover_missing_cache, key, False):
+        return {'object_exists': False}
+    
+    try:
+        obj = meta_sdk.get_api_object(object_type, object_id)
+        obj.remote_read(fields=['id', 'name'])
+    except FacebookRequestError as e:
+        error_code = e.api_error_code()
+        if error_code in _RATE_LIMIT_ERROR_CODES:
+            # Throttling says nothing about whether the object exists
+            logger.warning(f"Rate limited reading {object_type} {object_id}: code {error_code}")
+            return {'object_exists': None, 'error': 'rate_limited', 'error_code': error_code}
+        if not _is_not_found(e):
+            # Permission or transient failures may clear up, so don't cache them
+            logger.warning(f"Could not read {object_type} {object_id}: code {error_code}")
+            return {'object_exists': None, 'error': e.api_error_message(), 'error_code': error_code}
+        logger.info(f"{object_type} {object_id} does not exist")
+        _ttl_put(_discover_missing_cache, key, True, _DISCOVER_MISSING_TTL, _DISCOVER_MISSING_CACHE_SIZE)
+        return {'object_exists': False}
+    except Exception as e:
+        logger.warning(f"Could not read {object_type} {object_id}: {e}")
+        return {'object_exists': None, 'error': str(e)}
+    
+    metadata = {'object_exists': True, 'object_name': obj.get('name', 'Unknown')}
+    _ttl_put(_discover_object_cache, key, metadata, _DISCOVER_OBJECT_TTL, _DISCOVER_OBJECT_CACHE_SIZE)
+    return metadata
+
+
 @tool
 def meta_sdk_discover(object_type: str = "campaign", object_id: Optional[str] = None) -> Dict:
     """
@@ -916,126 +1214,50 @@ def meta_sdk_discover(object_type: str = "campaign", object_id: Optional[str] =
     Returns:
         Dictionary with available fields, edges, and capabilities
     """
-    # Common fields for different object types
-    field_mapping = {
-        "campaign": {
-            "fields": [
-                "name", "objective", "status", "effective_status", "daily_budget",
-                "lifetime_budget", "spend_cap", "created_time", "start_time", "stop_time",
-                "bid_strategy", "budget_optimization", "source_campaign_id"
-            ],
-            "edges": ["insights", "ads", "adsets", "ads_pixels", "copies"],
-            "insights_fields": [
-                # Basic metrics
-                "impressions", "clicks", "ctr", "cpc", "cpm", "cpp", "spend", "reach",
-                "frequency", "unique_clicks", "unique_ctr", "cost_per_unique_click",
-                
-                # Conversion metrics
-                "conversions", "conversion_rate", "cost_per_conversion", 
-                "purchase_roas", "website_purchase_roas", "mobile_app_purchase_roas",
-                
-                # Action metrics
-                "actions", "action_values", "cost_per_action_type", "unique_actions",
-                "website_ctr", "website_clicks", "deeplink_clicks", "app_store_clicks",
-                
-                # Video metrics
-                "video_views", "video_p25_watched_actions", "video_p50_watched_actions",
-                "video_p75_watched_actions", "video_p95_watched_actions", "video_p100_watched_actions",
-                "video_avg_time_watched_actions", "video_play_actions", "video_thruplay_watched_actions",
-                "cost_per_thruplay", "video_15s_watched_actions", "video_30_sec_watched_actions",
-                
-                # Engagement metrics
-                "engagement", "post_engagement", "page_engagement", "post_reactions",
-                "post_comments", "post_shares", "post_saves", "photo_views", "link_clicks",
-                "landing_page_views", "instant_experience_clicks_to_open", "instant_experience_clicks_to_start",
-                
-                # Lead metrics
-                "leads", "cost_per_lead", "lead_form_opens", "lead_form_views",
-                
-                # E-commerce metrics
-                "adds_to_cart", "adds_to_wishlist", "checkouts_initiated", "payment_info_added",
-                "purchases", "omni_purchases", "website_purchases", "in_app_purchases",
-                "offline_purchases", "catalog_segment_actions", "catalog_segment_value",
-                "catalog_segment_value_mobile_purchase_roas", "catalog_segment_value_omni_purchase_roas",
-                "catalog_segment_value_website_purchase_roas",
-                
-                # App metrics
-                "app_installs", "app_use", "app_activations", "app_registrations",
-                "app_sessions", "app_adds_to_cart", "app_adds_to_wishlist", "app_checkouts_initiated",
-                "app_content_views", "app_custom_events", "app_purchases", "app_ratings",
-                "app_achievement_unlocked", "app_tutorial_completed",
-                
-                # Store metrics
-                "store_location_page_views", "store_directions", "store_locator_searches",
-                
-                # Quality and relevance metrics
-                "quality_ranking", "engagement_rate_ranking", "conversion_rate_ranking",
-                "inline_link_clicks", "inline_link_click_ctr", "inline_post_engagement",
-                "unique_inline_link_clicks", "unique_inline_link_click_ctr",
-                
-                # Attribution metrics
-                "estimated_ad_recallers", "estimated_ad_recall_rate", "cost_per_estimated_ad_recaller",
-                "reach_frequency", "full_view_impressions", "full_view_reach",
-                
-                # Advanced metrics
-                "social_spend", "dda_countby_convs", "dda_results", "canvas_avg_view_percent",
-                "canvas_avg_view_time", "outbound_clicks", "outbound_clicks_ctr",
-                "unique_outbound_clicks", "unique_outbound_clicks_ctr"
-            ],
-            "breakdowns": [
-                "age", "gender", "country", "region", "dma", "device_platform",
-                "publisher_platform", "platform_position", "impression_device"
-            ]
-        },
-        "adset": {
-            "fields": [
-                "name", "status", "effective_status", "daily_budget", "lifetime_budget",
-                "bid_strategy", "optimization_goal", "billing_event", "targeting",
-                "promoted_object", "attribution_spec"
-            ],
-            "edges": ["insights", "ads", "activities", "delivery_estimate"],
-            "insights_fields": ["impressions", "clicks", "spend", "conversions"]
-        },
-        "ad": {
-            "fields": [
-                "name", "status", "effective_status", "creative", "bid_type",
-                "bid_amount", "targeting", "tracking_specs", "conversion_specs"
-            ],
-            "edges": ["insights", "creatives", "previews", "leads"],
-            "insights_fields": ["impressions", "clicks", "spend", "actions"]
-        },
-        "adaccount": {
-            "fields": [
-                "name", "account_status", "currency", "timezone_name", "spend_cap",
-                "amount_spent", "balance", "business", "capabilities"
-            ],
-            "edges": [
-                "campaigns", "adsets", "ads", "insights", "users", "custom_audiences",
-                "pixels", "applications", "businesses"
-            ]
-        }
-    }
-    
-    info = field_mapping.get(object_type.lower(), {})
+    # Copy so per-object metadata never leaks into the cached static payload
+    result = dict(_discover_static(object_type))
     
     if object_id and meta_sdk.access_token:
-        try:
-            # Try to get actual object metadata
-            obj = meta_sdk.get_api_object(object_type, object_id)
-            obj.remote_read(fields=['id', 'name'])
-            info['object_exists'] = True
-            info['object_name'] = obj.get('name', 'Unknown')
-        except:
-            info['object_exists'] = False
+        result.update(_discover_object(object_type, object_id))
     
-    return {
-        "object_type": object_type,
-        "available_fields": info.get("fields", []),
-        "available_edges": info.get("edges", []),
-        "insights_fields": info.get("insights_fields", []),
-        "breakdowns": info.get("breakdowns", []),
-        "description": f"Use meta_sdk_query to fetch any of these fields or edges for {object_type}"
-    }
+    return result
+
+
+# Recent batch results, keyed on (ad account, user phone, canonical query).
+# Only the tests call set_user_context, so in the app the phone is None and
+# entries are shared by every caller of the account.
+_BATCH_RESULT_TTL = 60  # seconds
+_BATCH_RESULT_CACHE_SIZE = 512
+_BATCH_MAX_WORKERS = 8
+_batch_result_cache: Dict[tuple, tuple] = {}
+
+
+def _query_key(query: Dict[str, Any]) -> str:
+    """Canonical form of a query so equivalent dicts compare equal"""
+    return json.dumps(query, sort_keys=True, default=str)
+
+
+def _execute_cached(key: str, query: Dict[str, Any]) -> Any:
+    """Run a query unless it ran within the last minute; callers get their own copy"""
+    cache_key = (meta_sdk._account_id_formatted, meta_sdk.current_user_phone, key)
+    cached = _ttl_get(_batch_result_cache, cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+    
+    result = meta_sdk.execute_query(query)
+    if not (isinstance(result, dict) and "error" in result):
+        _ttl_put(_batch_result_cache, cache_key, result, _BATCH_RESULT_TTL, _BATCH_RESULT_CACHE_SIZE)
+        return copy.deepcopy(result)
+    return result
+
+
+def _execute_batch_item(key: str, query: Dict[str, Any]) -> Any:
+    """Run one batch entry, turning failures into an error result"""
+    try:
+        return _execute_cached(key, query)
+    except Exception as e:
+        logger.error(f"Error in batch query {key}: {e}")
+        return {"error": str(e), "error_type": type(e).__name__}
 
 
 @tool
@@ -1043,19 +1265,89 @@ def meta_sdk_batch_query(queries: List[Dict[str, Any]]) -> List[Any]:
     """
     Execute multiple Meta API queries in batch for efficiency
     
+    Identical queries in the batch are only sent to Meta once.
+    
     Args:
         queries: List of query dictionaries (same format as meta_sdk_query)
     
     Returns:
         List of results for each query
     """
+    if not queries:
+        return []
+    
+    keys = [_query_key(query) for query in queries]
+    unique_queries = dict(zip(keys, queries))
+    
+    # Each query is I/O bound, so run the unique ones side by side
+    with ThreadPoolExecutor(max_workers=min(_BATCH_MAX_WORKERS, len(unique_queries))) as executor:
+        unique_results = executor.map(_execute_batch_item, unique_queries.keys(), unique_queries.values())
+        results_by_key = dict(zip(unique_queries.keys(), unique_results))
+    
+    # Repeated queries get copies so no two indices share a mutable result
     results = []
-    for query in queries:
-        result = meta_sdk.execute_query(query)
-        results.append(result)
+    seen = set()
+    for key in keys:
+        result = results_by_key[key]
+        results.append(copy.deepcopy(result) if key in seen else result)
+        seen.add(key)
     return results
 
 
+def _stream_writer():
+    """LangGraph custom stream writer, or a no-op outside a graph run"""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except (ImportError, RuntimeError):
+        return lambda chunk: None
+
+
+@tool
+async def meta_sdk_batch_query_stream(queries: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Execute multiple Meta API queries, streaming each result as it completes
+    
+    Works like meta_sdk_batch_query, but every finished query is emitted on
+    the graph's "custom" stream as {"index": i, "result": ...} so callers
+    using stream_mode="custom" can act on early results.
+    
+    Args:
+        queries: List of query dictionaries (same format as meta_sdk_query)
+    
+    Returns:
+        List of results for each query
+    """
+    if not queries:
+        return []
+    
+    writer = _stream_writer()
+    positions: Dict[str, List[int]] = {}
+    for index, query in enumerate(queries):
+        positions.setdefault(_query_key(query), []).append(index)
+    
+    # Same worker cap as meta_sdk_batch_query, whatever the default pool size
+    slots = asyncio.Semaphore(_BATCH_MAX_WORKERS)
+    
+    async def run(key: str, query: Dict[str, Any]) -> tuple:
+        async with slots:
+            return key, await asyncio.to_thread(_execute_batch_item, key, query)
+    
+    results: List[Any] = [None] * len(queries)
+    pending = [run(key, queries[indices[0]]) for key, indices in positions.items()]
+    for next_done in asyncio.as_completed(pending):
+        key, result = await next_done
+        for n, index in enumerate(positions[key]):
+            results[index] = copy.deepcopy(result) if n else result
+            writer({"index": index, "result": results[index]})
+    
+    return results
+
+
+# Object types meta_sdk_search knows how to query
+_SEARCH_TYPES = frozenset({"campaigns", "adsets"})
+
+
 @tool
 def meta_sdk_search(search_type: str, search_term: str, limit: int = 10) -> List[Dict]:
     """
@@ -1069,42 +1361,37 @@ def meta_sdk_search(search_type: str, search_term: str, limit: int = 10) -> List
     Returns:
         List of matching objects
     """
+    if not search_term or not search_term.strip():
+        return [{"error": "Empty search_term"}]
+    
+    if search_type not in _SEARCH_TYPES:
+        return [{"error": f"Search type {search_type} not supported"}]
+    
     if not meta_sdk._account_id_formatted:
         return [{"error": "No ad account configured"}]
     
-    account = AdAccount(meta_sdk._account_id_formatted)
+    account = meta_sdk.account
+    
+    # Let the Graph API do the name matching so only hits are transferred
+    params = {
+        'limit': limit,
+        'filtering': [{'field': 'name', 'operator': 'CONTAIN', 'value': search_term}]
+    }
     
     if search_type == "campaigns":
         campaigns = account.get_campaigns(
             fields=['name', 'status', 'objective'],
-            params={'limit': 500}  # Get more to search through
+            params=params
         )
-        results = []
-        for campaign in campaigns:
-            data = campaign.export_all_data()
-            if search_term.lower() in data.get('name', '').lower():
-                results.append(data)
-                if len(results) >= limit:
-                    break
-        return results
-    
-    elif search_type == "adsets":
+        return [campaign.export_all_data() for campaign in islice(campaigns, limit)]
+    
+    else:
         adsets = account.get_ad_sets(
             fields=['name', 'status', 'campaign_id'],
-            params={'limit': 500}
+            params=params
         )
-        results = []
-        for adset in adsets:
-            data = adset.export_all_data()
-            if search_term.lower() in data.get('name', '').lower():
-                results.append(data)
-                if len(results) >= limit:
-                    break
-        return results
-    
-    else:
-        return [{"error": f"Search type {search_type} not supported"}]
+        return [adset.export_all_data() for adset in islice(adsets, limit)]
 
 
 # Export the main tool for the agent to use
-__all__ = ['meta_sdk_query', 'meta_sdk_discover', 'meta_sdk_batch_query', 'meta_sdk_search']
+__all__ = ['meta_sdk_query', 'meta_sdk_discover', 'meta_sdk_batch_query', 'meta_sdk_batch_query_stream', 'meta_sdk_search']
@@ -5,6 +5,9 @@ import asyncio
 import aiohttp
 import json
 from dotenv import load_dotenv
+from tests._out import buffered_stdout
+from tests._http import read_json
+from tests._cities import CITIES_RE
 
 load_dotenv()
 
@@ -12,13 +15,58 @@ load_dotenv()
 CLOUD_URL = os.getenv("LANGGRAPH_CLOUD_URL", "https://api.langsmith.com")
 API_KEY = os.getenv("LANGCHAIN_API_KEY")
 
-async def test_cloud_query(query: str):
-    """Test a query against the cloud deployment"""
-    
+# Cap in-flight requests so the local server isn't flooded
+MAX_CONCURRENT_QUERIES = 4
+
+@buffered_stdout
+def _report(query: str, result, error):
+    """Print the checks for one query's response (or its error)"""
     print(f"\n{'='*60}")
     print(f"Testing: '{query}'")
     print('='*60)
     
+    if result is None:
+        print(error)
+        return
+    
+    # Extract key information
+    output = result.get("output", {})
+    
+    # Check intent
+    intent = output.get("intent", "unknown")
+    print(f"Intent Detected: {intent}")
+    
+    # Check if query was corrected
+    current_request = output.get("current_request", query)
+    if current_request != query:
+        print(f"✅ Query Corrected: '{query}' → '{current_request}'")
+    else:
+        print(f"⚠️ No correction applied")
+    
+    # Check language
+    language = output.get("language", "unknown")
+    print(f"Language: {language}")
+    
+    # Check final response
+    final_response = output.get("final_response", "No response")
+    
+    # Check if we got city data
+    if CITIES_RE.search(final_response):
+        print(f"✅ Got city performance data!")
+        print(f"Response preview: {final_response[:200]}...")
+    else:
+        print(f"❌ Generic response: {final_response[:200]}")
+    
+    # Check meta response
+    meta_response = output.get("meta_response", {})
+    if meta_response and meta_response.get("data"):
+        data = meta_response["data"]
+        if CITIES_RE.search(data):
+            print("✅ Meta agent returned city data")
+
+async def test_cloud_query(query: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore):
+    """Test a query against the cloud deployment"""
+    
     # Prepare the request
     headers = {
         "Content-Type": "application/json",
@@ -41,65 +89,28 @@ async def test_cloud_query(query: str):
     # For local testing via the LangGraph Studio API
     local_url = "http://localhost:8000/supervisor/invoke"
     
-    async with aiohttp.ClientSession() as session:
-        try:
-            # Try local deployment first
-            async with session.post(
-                local_url,
-                json={"input": payload},
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30)
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    
-                    # Extract key information
-                    output = result.get("output", {})
-                    
-                    # Check intent
-                    intent = output.get("intent", "unknown")
-                    print(f"Intent Detected: {intent}")
-                    
-                    # Check if query was corrected
-                    current_request = output.get("current_request", query)
-                    if current_request != query:
-                        print(f"✅ Query Corrected: '{query}' → '{current_request}'")
-                    else:
-                        print(f"⚠️ No correction applied")
-                    
-                    # Check language
-                    language = output.get("language", "unknown")
-                    print(f"Language: {language}")
-                    
-                    # Check final response
-                    final_response = output.get("final_response", "No response")
-                    
-                    # Check if we got city data
-                    if any(city in final_response.lower() for city in ["brooklyn", "miami", "houston", "chicago", "los angeles"]):
-                        print(f"✅ Got city performance data!")
-                        print(f"Response preview: {final_response[:200]}...")
-                    else:
-                        print(f"❌ Generic response: {final_response[:200]}")
-                    
-                    # Check meta response
-                    meta_response = output.get("meta_response", {})
-                    if meta_response and meta_response.get("data"):
-                        data = meta_response["data"]
-                        if "brooklyn" in data.lower() or "miami" in data.lower():
-                            print("✅ Meta agent returned city data")
-                    
-                    return result
-                else:
-                    print(f"❌ Error: HTTP {response.status}")
-                    error_text = await response.text()
-                    print(f"Error details: {error_text[:500]}")
-                    
-        except aiohttp.ClientError as e:
-            print(f"❌ Connection error: {e}")
-        except Exception as e:
-            print(f"❌ Unexpected error: {e}")
-    
-    return None
+    result = None
+    error = None
+    try:
+        # Try local deployment first
+        async with semaphore, session.post(
+            local_url,
+            json={"input": payload},
+            headers=headers
+        ) as response:
+            if response.status == 200:
+                result = await read_json(response)
+            else:
+                error_text = await response.text()
+                error = f"❌ Error: HTTP {response.status}\nError details: {error_text[:500]}"
+    except aiohttp.ClientError as e:
+        error = f"❌ Connection error: {e}"
+    except Exception as e:
+        error = f"❌ Unexpected error: {e}"
+    
+    # Report once the response is in so concurrent queries don't interleave
+    _report(query, result, error)
+    return result
 
 async def main():
     """Run test queries"""
@@ -116,13 +127,23 @@ async def main():
         "which city has most sales",  # Correct query for comparison
     ]
     
-    for query in test_queries:
-        result = await test_cloud_query(query)
-        await asyncio.sleep(1)  # Small delay between requests
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=8),
+        timeout=aiohttp.ClientTimeout(total=30, connect=5, sock_read=25)
+    ) as session:
+        results = await asyncio.gather(
+            *[test_cloud_query(query, session, semaphore) for query in test_queries],
+            return_exceptions=True
+        )
+    
+    for query, result in zip(test_queries, results):
+        if isinstance(result, Exception):
+            print(f"❌ '{query}' raised {type(result).__name__}: {result}")
     
     print("\n" + "=" * 60)
     print("✅ Test Complete")
     print("=" * 60)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -11,7 +11,33 @@ load_dotenv()
 sys.path.insert(0, os.path.dirname(__file__))
 
 from src.tools.meta_ads_tools import meta_sdk_query
-import json
+from tests._out import buffered_stdout
+from tests._json import dumps_pretty
+
+def sum_impressions_and_spend(result):
+    """Total impressions and spend over the insight rows in one pass"""
+    total_imp = 0
+    total_spend = 0.0
+    for item in result:
+        if isinstance(item, dict):
+            total_imp += int(item.get('impressions', 0))
+            total_spend += float(item.get('spend', 0))
+    return total_imp, total_spend
+
+@buffered_stdout
+def _print_result(title, query, result):
+    """Print one query and the totals it returned"""
+    print(f"\n{title}")
+    print("Query:")
+    print(dumps_pretty(query))
+    
+    if isinstance(result, list) and result:
+        total_imp, total_spend = sum_impressions_and_spend(result)
+        print(f"\n✅ SUCCESS: Got {len(result)} records")
+        print(f"   Total Impressions: {total_imp}")
+        print(f"   Total Spend: ${total_spend:.2f}")
+    else:
+        print(f"\n❌ FAILED: {result}")
 
 def test_nested_params():
     """Test both flat and nested query structures"""
@@ -31,21 +57,6 @@ def test_nested_params():
         }
     }
     
-    print("\nTEST 1: Nested params structure")
-    print("Query:")
-    print(json.dumps(nested_query, indent=2))
-    
-    result = meta_sdk_query.invoke({"query": nested_query})
-    
-    if isinstance(result, list) and result:
-        total_imp = sum(int(item.get('impressions', 0)) for item in result if isinstance(item, dict))
-        total_spend = sum(float(item.get('spend', 0)) for item in result if isinstance(item, dict))
-        print(f"\n✅ SUCCESS: Got {len(result)} records")
-        print(f"   Total Impressions: {total_imp}")
-        print(f"   Total Spend: ${total_spend:.2f}")
-    else:
-        print(f"\n❌ FAILED: {result}")
-    
     # Test 2: Flat structure (backward compatibility)
     flat_query = {
         "operation": "get_adsets_insights",
@@ -55,22 +66,6 @@ def test_nested_params():
         "level": "adset"
     }
     
-    print("\n" + "-"*50)
-    print("\nTEST 2: Flat structure (backward compatibility)")
-    print("Query:")
-    print(json.dumps(flat_query, indent=2))
-    
-    result = meta_sdk_query.invoke({"query": flat_query})
-    
-    if isinstance(result, list) and result:
-        total_imp = sum(int(item.get('impressions', 0)) for item in result if isinstance(item, dict))
-        total_spend = sum(float(item.get('spend', 0)) for item in result if isinstance(item, dict))
-        print(f"\n✅ SUCCESS: Got {len(result)} records")
-        print(f"   Total Impressions: {total_imp}")
-        print(f"   Total Spend: ${total_spend:.2f}")
-    else:
-        print(f"\n❌ FAILED: {result}")
-    
     # Test 3: Mixed structure (date_preset flat, other params nested)
     mixed_query = {
         "operation": "get_adsets_insights",
@@ -82,21 +77,16 @@ def test_nested_params():
         }
     }
     
-    print("\n" + "-"*50)
-    print("\nTEST 3: Mixed structure")
-    print("Query:")
-    print(json.dumps(mixed_query, indent=2))
-    
-    result = meta_sdk_query.invoke({"query": mixed_query})
-    
-    if isinstance(result, list) and result:
-        total_imp = sum(int(item.get('impressions', 0)) for item in result if isinstance(item, dict))
-        total_spend = sum(float(item.get('spend', 0)) for item in result if isinstance(item, dict))
-        print(f"\n✅ SUCCESS: Got {len(result)} records")
-        print(f"   Total Impressions: {total_imp}")
-        print(f"   Total Spend: ${total_spend:.2f}")
-    else:
-        print(f"\n❌ FAILED: {result}")
+    tests = [
+        ("TEST 1: Nested params structure", nested_query),
+        ("TEST 2: Flat structure (backward compatibility)", flat_query),
+        ("TEST 3: Mixed structure", mixed_query)
+    ]
+    for n, (title, query) in enumerate(tests):
+        if n:
+            print("\n" + "-"*50)
+        result = meta_sdk_query.invoke({"query": query})
+        _print_result(title, query, result)
     
     print("\n" + "="*100)
     print("SUMMARY: All query structures should now work with 'today' preset!")
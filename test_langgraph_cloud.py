@@ -3,7 +3,8 @@
 import os
 import asyncio
 from dotenv import load_dotenv
-from langgraph_sdk import get_client
+from tests._lg import lg_client, close_clients
+from tests._cities import CITIES_RE
 
 load_dotenv()
 
@@ -12,7 +13,7 @@ async def test_cloud_deployment():
     
     # Initialize the LangGraph client
     # For local testing, use localhost:8000
-    client = get_client(url="http://localhost:8000")
+    client = lg_client("http://localhost:8000")
     
     print("🚀 Testing LangGraph Deployment")
     print("=" * 60)
@@ -72,7 +73,7 @@ async def test_cloud_deployment():
             final_response = values.get("final_response", "")
             if final_response:
                 # Check if we got city data
-                if any(city in final_response.lower() for city in ["brooklyn", "miami", "houston", "chicago"]):
+                if CITIES_RE.search(final_response):
                     print(f"✅ Got city performance data!")
                     print(f"Response preview: {final_response[:200]}...")
                 else:
@@ -102,7 +103,7 @@ async def test_cloud_deployment():
 async def test_streaming():
     """Test streaming responses"""
     
-    client = get_client(url="http://localhost:8000")
+    client = lg_client("http://localhost:8000")
     
     print("\n🔄 Testing Streaming Response")
     print("=" * 60)
@@ -141,11 +142,18 @@ async def test_streaming():
     except Exception as e:
         print(f"❌ Streaming error: {e}")
 
+async def main():
+    # Both tests share one event loop and one client connection pool
+    try:
+        # Run the tests
+        await test_cloud_deployment()
+        
+        # Test streaming
+        await test_streaming()
+    finally:
+        await close_clients()
+
 if __name__ == "__main__":
     print("Testing LangGraph Cloud Deployment\n")
     
-    # Run the tests
-    asyncio.run(test_cloud_deployment())
-    
-    # Test streaming
-    asyncio.run(test_streaming())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
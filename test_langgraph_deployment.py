@@ -1,35 +1,50 @@
 #!/usr/bin/env python3
 """Test LangGraph deployment with typo queries using SDK"""
 import os
+import sys
+import io
 import asyncio
 import json
-from typing import Dict, Any
+from functools import partial
+from typing import Dict, Any, TextIO
 from dotenv import load_dotenv
 
 # Import langgraph SDK
 try:
-    from langgraph_sdk import get_client
+    from tests._lg import lg_client, close_clients
     HAS_SDK = True
 except ImportError:
     HAS_SDK = False
     print("Warning: langgraph-sdk not installed. Using HTTP client.")
 
 # For fallback HTTP testing
-import aiohttp
+from tests._http import get_session, close_session, read_json
+from tests._cities import CITIES_RE
 
 load_dotenv()
 
-async def test_with_sdk():
+# Graph input fields that are the same for every test query
+STATIC_INPUT = {
+    "phone_number": "+13054870475",
+    "contact_id": "test_123"
+}
+
+def _payload(query: str) -> Dict[str, Any]:
+    """Supervisor input for a single user query"""
+    return {"messages": [{"role": "user", "content": query}], **STATIC_INPUT}
+
+async def test_with_sdk(out: TextIO = sys.stdout):
     """Test using LangGraph SDK"""
+    emit = partial(print, file=out)
     if not HAS_SDK:
-        print("Skipping SDK test - langgraph-sdk not installed")
+        emit("Skipping SDK test - langgraph-sdk not installed")
         return
     
-    print("🚀 Testing with LangGraph SDK")
-    print("="*60)
+    emit("🚀 Testing with LangGraph SDK")
+    emit("="*60)
     
     # Get client for local deployment
-    client = get_client(url="http://localhost:8000")
+    client = lg_client("http://localhost:8000")
     
     # Test queries
     test_queries = [
@@ -40,42 +55,33 @@ async def test_with_sdk():
     ]
     
     for query, description in test_queries:
-        print(f"\n📝 {description}")
-        print(f"Query: '{query}'")
-        print("-"*40)
+        emit(f"\n📝 {description}")
+        emit(f"Query: '{query}'")
+        emit("-"*40)
         
         try:
-            # Create thread
-            thread = await client.threads.create()
-            
-            # Run the graph
-            run = await client.runs.create(
-                thread_id=thread["thread_id"],
-                assistant_id="supervisor",
-                input={
-                    "messages": [{"role": "user", "content": query}],
-                    "phone_number": "+13054870475",
-                    "contact_id": "test_123"
-                }
-            )
-            
-            # Wait for completion
-            await client.runs.wait(thread_id=thread["thread_id"], run_id=run["run_id"])
-            
-            # Get state
-            state = await client.threads.get_state(thread_id=thread["thread_id"])
+            # Threadless run streamed in "values" mode - the last chunk is the
+            # final state, so no thread create / wait / get_state round-trips
+            values = {}
+            async for chunk in client.runs.stream(
+                None,
+                "supervisor",
+                input=_payload(query),
+                stream_mode="values"
+            ):
+                if chunk.event == "values":
+                    values = chunk.data
             
             # Analyze results
-            values = state.get("values", {})
             
             # Check intent detection
             intent = values.get("intent", "unknown")
-            print(f"✓ Intent: {intent}")
+            emit(f"✓ Intent: {intent}")
             
             # Check query correction
             corrected = values.get("current_request", query)
             if corrected != query:
-                print(f"✅ Query corrected: '{query}' → '{corrected}'")
+                emit(f"✅ Query corrected: '{query}' → '{corrected}'")
             
             # Check final response
             final_response = values.get("final_response", "")
@@ -83,134 +89,137 @@ async def test_with_sdk():
             
             # Look for city data
             has_city_data = False
-            if final_response:
-                cities = ["brooklyn", "miami", "houston", "chicago", "los angeles"]
-                if any(city in final_response.lower() for city in cities):
-                    has_city_data = True
-                    print(f"✅ Got city performance data!")
-                    # Show snippet
-                    lines = final_response.split('\n')
-                    for line in lines[:5]:
-                        if any(city in line.lower() for city in cities):
-                            print(f"  → {line[:80]}")
+            if final_response and CITIES_RE.search(final_response):
+                has_city_data = True
+                emit(f"✅ Got city performance data!")
+                # Show snippet
+                for line in final_response.splitlines()[:5]:
+                    if CITIES_RE.search(line):
+                        emit(f"  → {line[:80]}")
             
             if meta_response.get("data"):
-                data_str = str(meta_response["data"]).lower()
-                if "brooklyn" in data_str or "miami" in data_str:
+                if CITIES_RE.search(str(meta_response["data"])):
                     has_city_data = True
-                    print("✅ Meta agent returned city data")
+                    emit("✅ Meta agent returned city data")
             
             if not has_city_data:
-                print(f"❌ No city data found in response")
+                emit(f"❌ No city data found in response")
                 if final_response:
-                    print(f"Response preview: {final_response[:150]}...")
+                    emit(f"Response preview: {final_response[:150]}...")
             
         except Exception as e:
-            print(f"❌ Error: {e}")
+            emit(f"❌ Error: {e}")
     
-    print("\n" + "="*60)
+    emit("\n" + "="*60)
 
-async def test_with_http():
+async def test_with_http(out: TextIO = sys.stdout):
     """Test using direct HTTP calls"""
-    print("\n🌐 Testing with HTTP Client")
-    print("="*60)
+    emit = partial(print, file=out)
+    emit("\n🌐 Testing with HTTP Client")
+    emit("="*60)
     
     url = "http://localhost:8000"
     
     # Test query
     query = "Which is the best citie"
     
-    async with aiohttp.ClientSession() as session:
-        try:
-            # Create thread
-            async with session.post(f"{url}/threads") as resp:
-                if resp.status != 200:
-                    print(f"❌ Failed to create thread: {resp.status}")
-                    return
-                thread = await resp.json()
-                thread_id = thread["thread_id"]
-            
-            print(f"✓ Created thread: {thread_id}")
-            
-            # Run supervisor
-            payload = {
-                "assistant_id": "supervisor",
-                "input": {
-                    "messages": [{"role": "user", "content": query}],
-                    "phone_number": "+13054870475",
-                    "contact_id": "test_123"
-                }
-            }
-            
-            async with session.post(
-                f"{url}/threads/{thread_id}/runs",
-                json=payload
-            ) as resp:
-                if resp.status != 200:
-                    print(f"❌ Failed to create run: {resp.status}")
-                    error = await resp.text()
-                    print(f"Error: {error[:200]}")
-                    return
-                run = await resp.json()
-                run_id = run["run_id"]
-            
-            print(f"✓ Created run: {run_id}")
-            
-            # Poll for completion
-            max_attempts = 30
-            for i in range(max_attempts):
-                await asyncio.sleep(1)
-                
-                async with session.get(
-                    f"{url}/threads/{thread_id}/runs/{run_id}"
-                ) as resp:
-                    if resp.status == 200:
-                        run_status = await resp.json()
-                        status = run_status.get("status")
-                        
-                        if status == "success":
-                            print("✅ Run completed successfully")
-                            break
-                        elif status == "error":
-                            print(f"❌ Run failed: {run_status.get('error')}")
-                            return
-                        else:
-                            if i % 5 == 0:
-                                print(f"  ⏳ Status: {status}")
+    session = await get_session()
+    try:
+        # Create thread
+        async with session.post(f"{url}/threads") as resp:
+            if resp.status != 200:
+                emit(f"❌ Failed to create thread: {resp.status}")
+                return
+            thread = await read_json(resp)
+            thread_id = thread["thread_id"]
+        
+        emit(f"✓ Created thread: {thread_id}")
+        
+        # Run supervisor
+        payload = {
+            "assistant_id": "supervisor",
+            "input": _payload(query)
+        }
+        
+        async with session.post(
+            f"{url}/threads/{thread_id}/runs",
+            json=payload
+        ) as resp:
+            if resp.status != 200:
+                emit(f"❌ Failed to create run: {resp.status}")
+                error = await resp.text()
+                emit(f"Error: {error[:200]}")
+                return
+            run = await read_json(resp)
+            run_id = run["run_id"]
+        
+        emit(f"✓ Created run: {run_id}")
+        
+        # Poll for completion, backing off from 50ms to 1s so fast runs are
+        # picked up quickly without hammering the server on slow ones
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 30
+        delay = 0.05
+        i = 0
+        while loop.time() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+            i += 1
             
-            # Get final state
             async with session.get(
-                f"{url}/threads/{thread_id}/state"
+                f"{url}/threads/{thread_id}/runs/{run_id}"
             ) as resp:
                 if resp.status == 200:
-                    state = await resp.json()
-                    values = state.get("values", {})
-                    
-                    # Check results
-                    intent = values.get("intent", "unknown")
-                    print(f"\n✓ Intent detected: {intent}")
+                    run_status = await read_json(resp)
+                    status = run_status.get("status")
                     
-                    corrected = values.get("current_request", query)
-                    if corrected != query:
-                        print(f"✅ Query corrected: '{query}' → '{corrected}'")
-                    
-                    final_response = values.get("final_response", "")
-                    if final_response:
-                        if "brooklyn" in final_response.lower():
-                            print("✅ Got city performance data!")
-                        else:
-                            print(f"Response: {final_response[:150]}...")
-                    
-                else:
-                    print(f"❌ Failed to get state: {resp.status}")
-                    
-        except Exception as e:
-            print(f"❌ Error: {type(e).__name__}: {e}")
+                    if status == "success":
+                        emit("✅ Run completed successfully")
+                        break
+                    elif status == "error":
+                        emit(f"❌ Run failed: {run_status.get('error')}")
+                        return
+                    else:
+                        if i % 5 == 1:
+                            emit(f"  ⏳ Status: {status}")
+        
+        # Get final state
+        async with session.get(
+            f"{url}/threads/{thread_id}/state"
+        ) as resp:
+            if resp.status == 200:
+                state = await read_json(resp)
+                values = state.get("values", {})
+                
+                # Check results
+                intent = values.get("intent", "unknown")
+                emit(f"\n✓ Intent detected: {intent}")
+                
+                corrected = values.get("current_request", query)
+                if corrected != query:
+                    emit(f"✅ Query corrected: '{query}' → '{corrected}'")
+                
+                final_response = values.get("final_response", "")
+                if final_response:
+                    if CITIES_RE.search(final_response):
+                        emit("✅ Got city performance data!")
+                    else:
+                        emit(f"Response: {final_response[:150]}...")
+                
+            else:
+                emit(f"❌ Failed to get state: {resp.status}")
+                
+    except Exception as e:
+        emit(f"❌ Error: {type(e).__name__}: {e}")
 
-async def test_invoke_endpoint():
+# Upper bound on /invoke requests in flight at once
+MAX_CONCURRENT_INVOKES = 10
+
+async def test_invoke_endpoint(out: TextIO = sys.stdout):
     """Test using the /invoke endpoint"""
-    print("\n🎯 Testing /invoke Endpoint")
-    print("="*60)
+    emit = partial(print, file=out)
+    emit("\n🎯 Testing /invoke Endpoint")
+    emit("="*60)
     
     url = "http://localhost:8000/supervisor/invoke"
     
@@ -219,62 +228,61 @@ async def test_invoke_endpoint():
         "wat is the bst performing city"
     ]
     
-    async with aiohttp.ClientSession() as session:
-        for query in queries:
-            print(f"\nTesting: '{query}'")
-            print("-"*40)
-            
-            payload = {
-                "input": {
-                    "messages": [{"role": "user", "content": query}],
-                    "phone_number": "+13054870475",
-                    "contact_id": "test_123"
-                }
-            }
-            
-            try:
-                async with session.post(
-                    url,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as resp:
-                    if resp.status == 200:
-                        result = await resp.json()
-                        output = result.get("output", {})
-                        
-                        # Check intent
-                        intent = output.get("intent", "unknown")
-                        print(f"✓ Intent: {intent}")
-                        
-                        # Check correction
-                        corrected = output.get("current_request", query)
-                        if corrected != query:
-                            print(f"✅ Corrected: '{query}' → '{corrected}'")
-                        
-                        # Check response
-                        final_response = output.get("final_response", "")
-                        if final_response:
-                            cities = ["brooklyn", "miami", "houston", "chicago"]
-                            if any(city in final_response.lower() for city in cities):
-                                print("✅ Got city data!")
-                                # Show first city mention
-                                for city in cities:
-                                    if city in final_response.lower():
-                                        idx = final_response.lower().index(city)
-                                        snippet = final_response[max(0,idx-20):idx+50]
-                                        print(f"  → ...{snippet}...")
-                                        break
-                            else:
-                                print(f"❌ No city data: {final_response[:100]}...")
-                    else:
-                        print(f"❌ HTTP {resp.status}")
-                        error = await resp.text()
-                        print(f"Error: {error[:200]}")
-                        
-            except asyncio.TimeoutError:
-                print("❌ Request timed out")
-            except Exception as e:
-                print(f"❌ Error: {e}")
+    session = await get_session()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_INVOKES)
+    
+    async def check(query: str, buf: TextIO):
+        emit = partial(print, file=buf)
+        emit(f"\nTesting: '{query}'")
+        emit("-"*40)
+        
+        payload = {"input": _payload(query)}
+        
+        try:
+            async with semaphore, session.post(
+                url,
+                json=payload
+            ) as resp:
+                if resp.status == 200:
+                    result = await read_json(resp)
+                    output = result.get("output", {})
+                    
+                    # Check intent
+                    intent = output.get("intent", "unknown")
+                    emit(f"✓ Intent: {intent}")
+                    
+                    # Check correction
+                    corrected = output.get("current_request", query)
+                    if corrected != query:
+                        emit(f"✅ Corrected: '{query}' → '{corrected}'")
+                    
+                    # Check response
+                    final_response = output.get("final_response", "")
+                    if final_response:
+                        match = CITIES_RE.search(final_response)
+                        if match:
+                            emit("✅ Got city data!")
+                            # Show first city mention
+                            idx = match.start()
+                            snippet = final_response[max(0,idx-20):idx+50]
+                            emit(f"  → ...{snippet}...")
+                        else:
+                            emit(f"❌ No city data: {final_response[:100]}...")
+                else:
+                    emit(f"❌ HTTP {resp.status}")
+                    error = await resp.text()
+                    emit(f"Error: {error[:200]}")
+                    
+        except asyncio.TimeoutError:
+            emit("❌ Request timed out")
+        except Exception as e:
+            emit(f"❌ Error: {e}")
+    
+    # Run every query at once and print each one's output in input order
+    buffers = [io.StringIO() for _ in queries]
+    await asyncio.gather(*(check(query, buf) for query, buf in zip(queries, buffers)))
+    for buf in buffers:
+        out.write(buf.getvalue())
 
 async def main():
     """Run all tests"""
@@ -284,15 +292,26 @@ async def main():
     print(f"Test URL: http://localhost:8000")
     print("="*60)
     
-    # Test with SDK if available
+    # The suites hit independent endpoints, so run them side by side and
+    # print each one's buffered output in order once they are all done
+    suites = [test_with_http, test_invoke_endpoint]
     if HAS_SDK:
-        await test_with_sdk()
+        suites.insert(0, test_with_sdk)
     
-    # Test with HTTP client
-    await test_with_http()
+    buffers = [io.StringIO() for _ in suites]
+    results = await asyncio.gather(
+        *(suite(buf) for suite, buf in zip(suites, buffers)),
+        return_exceptions=True
+    )
     
-    # Test invoke endpoint
-    await test_invoke_endpoint()
+    for suite, buf, result in zip(suites, buffers, results):
+        sys.stdout.write(buf.getvalue())
+        if isinstance(result, Exception):
+            print(f"❌ {suite.__name__} raised {type(result).__name__}: {result}")
+    
+    await close_session()
+    if HAS_SDK:
+        await close_clients()
     
     print("\n" + "="*60)
     print("✅ All tests completed")
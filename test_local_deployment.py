@@ -4,11 +4,11 @@ Test the local LangGraph deployment
 """
 import asyncio
 import json
-from langgraph_sdk import get_client
+from tests._lg import lg_client, close_clients
 
 async def test_meta_agent():
     """Test querying sales data through meta_agent"""
-    client = get_client(url="http://localhost:2024")
+    client = lg_client("http://localhost:2024")
     
     # Test 1: Ask for today's sales
     print("=" * 50)
@@ -79,9 +79,15 @@ async def test_meta_agent():
                     if hasattr(msg, "content"):
                         print(f"Response: {msg.content}")
 
+async def main():
+    try:
+        await test_meta_agent()
+    finally:
+        await close_clients()
+
 if __name__ == "__main__":
     print("Testing Local LangGraph Deployment")
     print("Server: http://localhost:2024")
     print()
     
-    asyncio.run(test_meta_agent())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
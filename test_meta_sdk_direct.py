@@ -3,16 +3,104 @@
 Direct Meta SDK call to verify data exists for today
 """
 
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from tests._env import loaded_env, fb_api
+from tests._out import buffered_stdout
+loaded_env()
 
-from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.campaign import Campaign
 from facebook_business.adobjects.adset import AdSet
 import json
 
+# Field lists and params shared by every campaign/adset request below
+_CAMPAIGN_FIELDS = ('name', 'status', 'objective')
+_INSIGHTS_FIELDS = ('impressions', 'clicks', 'spend', 'actions', 'action_values')
+_ADSET_FIELDS = ('name', 'status', 'targeting')
+_ADSET_INSIGHTS_FIELDS = ('impressions', 'clicks', 'spend')
+_PARAMS_TODAY = {'date_preset': 'today', 'level': 'campaign'}
+_PARAMS_MAX = {'date_preset': 'maximum', 'level': 'campaign'}
+_PARAMS_ADSETS = {'limit': 5}
+_PARAMS_ADSET_TODAY = {'date_preset': 'today'}
+
+def _store(results, key):
+    """Batch callbacks that save a sub-request's JSON (or error) under key"""
+    def success(response):
+        results[key] = response.json()
+    
+    def failure(response):
+        results[key] = {'error': response.error().api_error_message()}
+    
+    return {'success': success, 'failure': failure}
+
+def _rows(result):
+    """Rows of an edge response stored by _store, or [] on error"""
+    if not result or 'error' in result:
+        return []
+    return result.get('data', [])
+
+def _print_insights(rows, empty_message):
+    """Print impressions, clicks, spend and purchases for insight rows"""
+    if not rows:
+        print(empty_message)
+        return
+    
+    for data in rows:
+        print(f"   Impressions: {data.get('impressions', 0)}")
+        print(f"   Clicks: {data.get('clicks', 0)}")
+        print(f"   Spend: ${data.get('spend', 0)}")
+        
+        # Check for purchase actions
+        actions = data.get('actions', [])
+        purchases = 0
+        for action in actions:
+            if 'purchase' in action.get('action_type', ''):
+                purchases = int(action.get('value', 0))
+                print(f"   Purchases: {purchases}")
+        
+        if purchases == 0:
+            print(f"   Purchases: 0 (no purchase actions found)")
+
+@buffered_stdout
+def _print_campaign(campaign_id, results):
+    """Print the batched info, insights and adsets for one campaign"""
+    print(f"\n📊 Testing Campaign: {campaign_id}")
+    print("-" * 50)
+    
+    campaign_info = results.get((campaign_id, 'info'), {})
+    if 'error' in campaign_info:
+        print(f"   ❌ Error: {campaign_info['error']}")
+        return
+    
+    # Test 1: Get campaign info
+    print("\n1️⃣ Campaign Info:")
+    print(f"   Name: {campaign_info.get('name', 'N/A')}")
+    print(f"   Status: {campaign_info.get('status', 'N/A')}")
+    print(f"   Objective: {campaign_info.get('objective', 'N/A')}")
+    
+    # Test 2: Get insights for TODAY
+    print("\n2️⃣ Insights for TODAY:")
+    _print_insights(_rows(results.get((campaign_id, 'today'))), "   ❌ No data for today")
+    
+    # Test 3: Get insights for MAXIMUM (all-time)
+    print("\n3️⃣ Insights for ALL-TIME (maximum):")
+    _print_insights(_rows(results.get((campaign_id, 'maximum'))), "   ❌ No all-time data")
+    
+    # Test 4: Get AdSets for the campaign
+    print("\n4️⃣ AdSets in Campaign:")
+    adsets = _rows(results.get((campaign_id, 'adsets')))
+    for adset in adsets[:3]:
+        print(f"   • {adset.get('name', 'Unnamed')} - Status: {adset.get('status', 'N/A')}")
+        
+        # Get today's data for this adset
+        for data in _rows(results.get((adset['id'], 'today'))):
+            imp = data.get('impressions', 0)
+            clicks = data.get('clicks', 0)
+            spend = data.get('spend', 0)
+            print(f"     Today: {imp} impressions, {clicks} clicks, ${spend} spend")
+    
+    if len(adsets) > 3:  # Limit to first 3 adsets
+        print(f"   ... and more")
+
 def test_meta_sdk_direct():
     """Direct Meta SDK call to check today's data"""
     
@@ -21,15 +109,11 @@ def test_meta_sdk_direct():
     print("="*100)
     
     # Initialize the SDK
-    app_id = os.getenv('META_APP_ID')
-    app_secret = os.getenv('META_APP_SECRET')
-    access_token = os.getenv('META_ACCESS_TOKEN')
-    
-    if not all([app_id, app_secret, access_token]):
+    if not all(loaded_env()):
         print("❌ Missing Meta API credentials in .env")
         return
     
-    FacebookAdsApi.init(app_id, app_secret, access_token)
+    api = fb_api()
     print("✅ Meta SDK initialized")
     
     # Test campaign IDs from the codebase
@@ -38,125 +122,47 @@ def test_meta_sdk_direct():
         "120210696387540704",  # Alternative campaign
     ]
     
+    results = {}
+    
+    # Round 1: info, today/all-time insights and adsets for every campaign in one batch
+    batch = api.new_batch()
     for campaign_id in test_campaigns:
-        print(f"\n📊 Testing Campaign: {campaign_id}")
-        print("-" * 50)
-        
-        try:
-            campaign = Campaign(campaign_id)
-            
-            # Test 1: Get campaign info
-            print("\n1️⃣ Campaign Info:")
-            campaign_info = campaign.api_get(fields=['name', 'status', 'objective'])
-            print(f"   Name: {campaign_info.get('name', 'N/A')}")
-            print(f"   Status: {campaign_info.get('status', 'N/A')}")
-            print(f"   Objective: {campaign_info.get('objective', 'N/A')}")
-            
-            # Test 2: Get insights for TODAY
-            print("\n2️⃣ Insights for TODAY:")
-            insights_today = campaign.get_insights(
-                fields=[
-                    'impressions',
-                    'clicks', 
-                    'spend',
-                    'actions',
-                    'action_values'
-                ],
-                params={
-                    'date_preset': 'today',
-                    'level': 'campaign'
-                }
-            )
-            
-            if insights_today:
-                for insight in insights_today:
-                    data = dict(insight)
-                    print(f"   Impressions: {data.get('impressions', 0)}")
-                    print(f"   Clicks: {data.get('clicks', 0)}")
-                    print(f"   Spend: ${data.get('spend', 0)}")
-                    
-                    # Check for purchase actions
-                    actions = data.get('actions', [])
-                    purchases = 0
-                    for action in actions:
-                        if 'purchase' in action.get('action_type', ''):
-                            purchases = int(action.get('value', 0))
-                            print(f"   Purchases: {purchases}")
-                    
-                    if purchases == 0:
-                        print(f"   Purchases: 0 (no purchase actions found)")
-            else:
-                print("   ❌ No data for today")
-            
-            # Test 3: Get insights for MAXIMUM (all-time)
-            print("\n3️⃣ Insights for ALL-TIME (maximum):")
-            insights_max = campaign.get_insights(
-                fields=[
-                    'impressions',
-                    'clicks',
-                    'spend',
-                    'actions',
-                    'action_values'
-                ],
-                params={
-                    'date_preset': 'maximum',
-                    'level': 'campaign'
-                }
-            )
-            
-            if insights_max:
-                for insight in insights_max:
-                    data = dict(insight)
-                    print(f"   Impressions: {data.get('impressions', 0)}")
-                    print(f"   Clicks: {data.get('clicks', 0)}")
-                    print(f"   Spend: ${data.get('spend', 0)}")
-                    
-                    # Check for purchase actions
-                    actions = data.get('actions', [])
-                    purchases = 0
-                    for action in actions:
-                        if 'purchase' in action.get('action_type', ''):
-                            purchases = int(action.get('value', 0))
-                            print(f"   Purchases: {purchases}")
-                    
-                    if purchases == 0:
-                        print(f"   Purchases: 0 (no purchase actions found)")
-            else:
-                print("   ❌ No all-time data")
-            
-            # Test 4: Get AdSets for the campaign
-            print("\n4️⃣ AdSets in Campaign:")
-            adsets = campaign.get_ad_sets(
-                fields=['name', 'status', 'targeting'],
-                params={'limit': 5}
+        campaign = Campaign(campaign_id)
+        campaign.api_get(
+            fields=_CAMPAIGN_FIELDS,
+            batch=batch, **_store(results, (campaign_id, 'info'))
+        )
+        campaign.get_insights(
+            fields=_INSIGHTS_FIELDS,
+            params=_PARAMS_TODAY,
+            batch=batch, **_store(results, (campaign_id, 'today'))
+        )
+        campaign.get_insights(
+            fields=_INSIGHTS_FIELDS,
+            params=_PARAMS_MAX,
+            batch=batch, **_store(results, (campaign_id, 'maximum'))
+        )
+        campaign.get_ad_sets(
+            fields=_ADSET_FIELDS,
+            params=_PARAMS_ADSETS,
+            batch=batch, **_store(results, (campaign_id, 'adsets'))
+        )
+    batch.execute()
+    
+    # Round 2: today's insights for the first 3 adsets of each campaign in one batch
+    batch = api.new_batch()
+    for campaign_id in test_campaigns:
+        for adset in _rows(results.get((campaign_id, 'adsets')))[:3]:
+            AdSet(adset['id']).get_insights(
+                fields=_ADSET_INSIGHTS_FIELDS,
+                params=_PARAMS_ADSET_TODAY,
+                batch=batch, **_store(results, (adset['id'], 'today'))
             )
-            
-            adset_count = 0
-            for adset in adsets:
-                adset_count += 1
-                print(f"   • {adset.get('name', 'Unnamed')} - Status: {adset.get('status', 'N/A')}")
-                
-                # Get today's data for this adset
-                adset_obj = AdSet(adset['id'])
-                adset_insights = adset_obj.get_insights(
-                    fields=['impressions', 'clicks', 'spend'],
-                    params={'date_preset': 'today'}
-                )
-                
-                if adset_insights:
-                    for insight in adset_insights:
-                        data = dict(insight)
-                        imp = data.get('impressions', 0)
-                        clicks = data.get('clicks', 0)
-                        spend = data.get('spend', 0)
-                        print(f"     Today: {imp} impressions, {clicks} clicks, ${spend} spend")
-                
-                if adset_count >= 3:  # Limit to first 3 adsets
-                    print(f"   ... and more")
-                    break
-            
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+    if len(batch) > 0:
+        batch.execute()
+    
+    for campaign_id in test_campaigns:
+        _print_campaign(campaign_id, results)
     
     print("\n" + "="*100)
     print("💡 ANALYSIS:")
@@ -5,65 +5,42 @@ Test meta_sdk_query function directly to isolate the issue
 
 import os
 import sys
-from dotenv import load_dotenv
-load_dotenv()
 
 sys.path.insert(0, os.path.dirname(__file__))
 
+from tests._env import loaded_env
+from tests._out import buffered_stdout
+loaded_env()
+
 from src.tools.meta_ads_tools import meta_sdk_query
 import json
+import pandas as pd
 
-def test_meta_sdk_query_today():
-    """Test the meta_sdk_query function with today preset"""
-    
-    print("="*100)
-    print("TESTING meta_sdk_query FUNCTION DIRECTLY")
-    print("="*100)
-    
-    # Test query for today - similar to what the system generates
-    query = {
-        "operation": "get_adsets_insights",
-        "campaign_id": "120232002620350525",
-        "date_preset": "today",
-        "fields": ["impressions", "clicks", "spend", "ctr", "cpc", "cpm", "actions", "action_values", "purchase_roas"],
-        "level": "adset"
-    }
-    
-    print("\nQuery being sent:")
-    print(json.dumps(query, indent=2))
-    
-    print("\n" + "-"*50)
-    print("Calling meta_sdk_query.invoke() as a tool...")
-    print("-"*50)
-    
-    # Call as a tool (needs to be wrapped in "query" key)
-    result = meta_sdk_query.invoke({"query": query})
-    
+@buffered_stdout
+def _print_result(result):
+    """Print the per-adset rows and totals for one meta_sdk_query result"""
     print(f"\nResult type: {type(result)}")
     
     if isinstance(result, list):
         print(f"Number of records: {len(result)}")
         
         if result:
-            # Aggregate totals
-            total_impressions = 0
-            total_clicks = 0
-            total_spend = 0
+            # Aggregate totals in one vectorized pass
+            rows = pd.DataFrame([item for item in result if isinstance(item, dict)])
+            metrics = rows.reindex(columns=['impressions', 'clicks', 'spend']).fillna(0).astype(
+                {'impressions': 'int64', 'clicks': 'int64', 'spend': 'float64'}
+            )
+            names = rows.reindex(columns=['adset_name'])['adset_name'].fillna('Unknown')
+            # Sum per column - metrics.sum() would upcast the counts to float
+            total_impressions = int(metrics['impressions'].sum())
+            total_clicks = int(metrics['clicks'].sum())
+            total_spend = float(metrics['spend'].sum())
             
-            for item in result:
-                if isinstance(item, dict):
-                    imp = int(item.get('impressions', 0))
-                    clicks = int(item.get('clicks', 0))
-                    spend = float(item.get('spend', 0))
-                    
-                    total_impressions += imp
-                    total_clicks += clicks
-                    total_spend += spend
-                    
-                    print(f"\nAdSet: {item.get('adset_name', 'Unknown')}")
-                    print(f"  Impressions: {imp}")
-                    print(f"  Clicks: {clicks}")
-                    print(f"  Spend: ${spend}")
+            for name, imp, clicks, spend in zip(names, *(metrics[col] for col in metrics.columns)):
+                print(f"\nAdSet: {name}")
+                print(f"  Impressions: {imp}")
+                print(f"  Clicks: {clicks}")
+                print(f"  Spend: ${spend}")
             
             print("\n" + "="*100)
             print("TOTALS:")
@@ -84,7 +61,34 @@ def test_meta_sdk_query_today():
             print(f"Result: {json.dumps(result, indent=2, default=str)}")
     else:
         print(f"Unexpected result: {result}")
+
+def test_meta_sdk_query_today():
+    """Test the meta_sdk_query function with today preset"""
+    
+    print("="*100)
+    print("TESTING meta_sdk_query FUNCTION DIRECTLY")
+    print("="*100)
+    
+    # Test query for today - similar to what the system generates
+    query = {
+        "operation": "get_adsets_insights",
+        "campaign_id": "120232002620350525",
+        "date_preset": "today",
+        "fields": ["impressions", "clicks", "spend", "ctr", "cpc", "cpm", "actions", "action_values", "purchase_roas"],
+        "level": "adset"
+    }
     
+    print("\nQuery being sent:")
+    print(json.dumps(query, indent=2))
+    
+    print("\n" + "-"*50)
+    print("Calling meta_sdk_query.invoke() as a tool...")
+    print("-"*50)
+    
+    # Call as a tool (needs to be wrapped in "query" key)
+    result = meta_sdk_query.invoke({"query": query})
+    _print_result(result)
+
 
 if __name__ == "__main__":
     test_meta_sdk_query_today()
\ No newline at end of file
@@ -7,13 +7,39 @@ import os
 import sys
 import json
 import asyncio
-from dotenv import load_dotenv
-load_dotenv()
+from collections import deque
 
 sys.path.insert(0, os.path.dirname(__file__))
 
+from tests._env import loaded_env
+loaded_env()
+
 from src.agents.meta_campaign_agent import plan_and_execute_dynamic_queries
 
+# Fake data returned instead of an actual API call
+_FAKE_RESULT = [
+    {
+        "adset_name": "Test City",
+        "impressions": "1000",
+        "clicks": "100",
+        "spend": "50.00"
+    }
+]
+
+# Bounded so a looping planner can't grow this without limit
+captured_queries = deque(maxlen=1024)
+
+def capture_invoke(input_dict, *args, **kwargs):
+    """Capture the query being sent"""
+    captured_queries.append(input_dict)
+    return _FAKE_RESULT
+
+def print_captured_queries():
+    """Show every query captured since the last clear"""
+    for input_dict in captured_queries:
+        print("\n📦 CAPTURED QUERY TO meta_sdk_query.invoke():")
+        print(json.dumps(input_dict, indent=2))
+
 async def test_query_generation():
     """Test what query the AI generates for 'today' requests"""
     
@@ -23,23 +49,6 @@ async def test_query_generation():
     
     # Monkey-patch to intercept the queries
     original_invoke = None
-    captured_queries = []
-    
-    def capture_invoke(self, input_dict):
-        """Capture the query being sent"""
-        captured_queries.append(input_dict)
-        print("\n📦 CAPTURED QUERY TO meta_sdk_query.invoke():")
-        print(json.dumps(input_dict, indent=2))
-        
-        # Return fake data to avoid actual API call
-        return [
-            {
-                "adset_name": "Test City",
-                "impressions": "1000",
-                "clicks": "100",
-                "spend": "50.00"
-            }
-        ]
     
     # Patch the function
     from src.tools import meta_ads_tools
@@ -59,6 +68,7 @@ async def test_query_generation():
             language="en"
         )
         
+        print_captured_queries()
         print(f"\nResult: {result}")
         
         # Test 2: Query for all-time
@@ -75,6 +85,7 @@ async def test_query_generation():
             language="en"
         )
         
+        print_captured_queries()
         print(f"\nResult: {result}")
         
     finally:
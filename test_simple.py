@@ -2,69 +2,68 @@
 """
 Simple test of the local LangGraph deployment without streaming
 """
-import requests
+import asyncio
 import json
+from tests._http import get_session, close_session, read_json
 
-def test_meta_agent():
-    """Test the meta_agent with simple POST requests"""
-    
-    url = "http://localhost:2024/runs"
-    
-    # Test 1: Today's sales
-    print("=" * 50)
-    print("TEST 1: Asking for today's sales")
-    print("=" * 50)
-    
+URL = "http://localhost:2024/runs"
+
+# (title, question) pairs sent to the meta_agent
+TESTS = [
+    ("TEST 1: Asking for today's sales", "how many sales today"),
+    ("TEST 2: Asking for all-time sales", "how many sales"),
+]
+
+async def _ask(session, content):
+    """POST one question and return (data, error)"""
     payload = {
         "assistant_id": "meta_agent",
         "input": {
             "messages": [{
                 "role": "user",
-                "content": "how many sales today"
+                "content": content
             }]
         }
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=30)
-        if response.status_code == 200:
-            data = response.json()
-            if "output" in data and "messages" in data["output"]:
-                for msg in data["output"]["messages"]:
-                    if isinstance(msg, dict) and "content" in msg:
-                        print(f"Response: {msg['content']}")
-        else:
-            print(f"Error: {response.status_code}")
-            print(response.text)
+        async with session.post(URL, json=payload) as response:
+            if response.status == 200:
+                return await read_json(response), None
+            return None, f"Error: {response.status}\n{await response.text()}"
     except Exception as e:
-        print(f"Error: {e}")
-    
-    print()
-    
-    # Test 2: All-time sales
-    print("=" * 50)
-    print("TEST 2: Asking for all-time sales")
-    print("=" * 50)
+        return None, f"Error: {e}"
+
+async def test_meta_agent():
+    """Test the meta_agent with simple POST requests"""
+    session = await get_session()
     
-    payload["input"]["messages"][0]["content"] = "how many sales"
+    # Both questions go out together; results are printed in order
+    outcomes = await asyncio.gather(*(_ask(session, content) for _, content in TESTS))
     
+    for (title, _), (data, error) in zip(TESTS, outcomes):
+        print("=" * 50)
+        print(title)
+        print("=" * 50)
+        
+        if error:
+            print(error)
+        elif "output" in data and "messages" in data["output"]:
+            for msg in data["output"]["messages"]:
+                if isinstance(msg, dict) and "content" in msg:
+                    print(f"Response: {msg['content']}")
+        
+        print()
+
+async def main():
     try:
-        response = requests.post(url, json=payload, timeout=30)
-        if response.status_code == 200:
-            data = response.json()
-            if "output" in data and "messages" in data["output"]:
-                for msg in data["output"]["messages"]:
-                    if isinstance(msg, dict) and "content" in msg:
-                        print(f"Response: {msg['content']}")
-        else:
-            print(f"Error: {response.status_code}")
-            print(response.text)
-    except Exception as e:
-        print(f"Error: {e}")
+        await test_meta_agent()
+    finally:
+        await close_session()
 
 if __name__ == "__main__":
     print("Testing Local LangGraph Deployment (Non-streaming)")
     print("Server: http://localhost:2024")
     print()
     
-    test_meta_agent()
\ No newline at end of file
+    asyncio.run(main())
@@ -12,8 +12,7 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.campaign import Campaign
-from facebook_business.adobjects.adset import AdSet
-import json
+from tests._json import dumps_pretty
 
 def test_today_direct():
     """Test today preset directly with Meta SDK"""
@@ -42,46 +41,34 @@ def test_today_direct():
     print(f"Campaign insights for today: {len(insights_list)} records")
     for insight in insights_list:
         data = dict(insight)
-        print(json.dumps(data, indent=2, default=str))
+        print(dumps_pretty(data))
     
     print("\n" + "="*100)
     print("TESTING ADSET LEVEL - TODAY")
     print("="*100)
     
-    # Get adsets
-    adsets = campaign.get_ad_sets(fields=['id', 'name', 'status'], params={'limit': 5})
+    # One campaign-level insights call broken down per adset
+    params = {'date_preset': 'today', 'level': 'adset'}
+    adset_rows = [dict(insight) for insight in campaign.get_insights(fields=['adset_id', 'adset_name'] + fields, params=params)]
     
-    total_impressions = 0
-    total_clicks = 0
-    total_spend = 0
+    # (impressions, clicks, spend) per adset, totalled column-wise below
+    metrics = [
+        (int(data.get('impressions', 0)), int(data.get('clicks', 0)), float(data.get('spend', 0)))
+        for data in adset_rows
+    ]
     
-    for adset in adsets:
-        adset_id = adset['id']
-        adset_name = adset.get('name', 'Unknown')
-        print(f"\nAdSet: {adset_name} (ID: {adset_id})")
-        
-        adset_obj = AdSet(adset_id)
-        params = {'date_preset': 'today', 'level': 'adset'}
-        
-        insights = adset_obj.get_insights(fields=fields, params=params)
-        insights_list = list(insights)
-        
-        if insights_list:
-            for insight in insights_list:
-                data = dict(insight)
-                imp = int(data.get('impressions', 0))
-                clicks = int(data.get('clicks', 0))
-                spend = float(data.get('spend', 0))
-                
-                total_impressions += imp
-                total_clicks += clicks
-                total_spend += spend
-                
-                print(f"  Impressions: {imp}")
-                print(f"  Clicks: {clicks}")
-                print(f"  Spend: ${spend}")
-        else:
-            print("  No data for today")
+    for data, (imp, clicks, spend) in zip(adset_rows, metrics):
+        print(f"\nAdSet: {data.get('adset_name', 'Unknown')} (ID: {data.get('adset_id')})")
+        print(f"  Impressions: {imp}")
+        print(f"  Clicks: {clicks}")
+        print(f"  Spend: ${spend}")
+    
+    if not adset_rows:
+        print("  No adset data for today")
+    
+    total_impressions, total_clicks, total_spend = (
+        map(sum, zip(*metrics)) if metrics else (0, 0, 0)
+    )
     
     print("\n" + "="*100)
     print("TOTALS FOR TODAY:")
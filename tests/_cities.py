@@ -0,0 +1,12 @@
+"""
+Cities the deployment test scripts expect in a city-performance answer
+"""
+import re
+
+CITY_LIST = ["Brooklyn", "Miami", "Houston", "Chicago", "Los Angeles"]
+
+# One alternation over every city, longest first, so a scan is a single pass
+CITIES_RE = re.compile(
+    "|".join(re.escape(city) for city in sorted(CITY_LIST, key=len, reverse=True)),
+    re.IGNORECASE
+)
@@ -0,0 +1,34 @@
+"""
+Shared environment setup for the test scripts
+Loads .env and initializes the Meta SDK at most once per process
+"""
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+from dotenv import load_dotenv
+from facebook_business.api import FacebookAdsApi
+
+
+@lru_cache(maxsize=1)
+def env() -> Mapping[str, str]:
+    """Load .env into the process environment once and return a read-only snapshot"""
+    load_dotenv()
+    return MappingProxyType(dict(os.environ))
+
+
+@lru_cache(maxsize=1)
+def loaded_env():
+    """Load .env once and return (META_APP_ID, META_APP_SECRET, META_ACCESS_TOKEN)"""
+    values = env()
+    return (
+        values.get('META_APP_ID'),
+        values.get('META_APP_SECRET'),
+        values.get('META_ACCESS_TOKEN')
+    )
+
+
+@lru_cache(maxsize=1)
+def fb_api() -> FacebookAdsApi:
+    """Initialize FacebookAdsApi once with the loaded credentials"""
+    return FacebookAdsApi.init(*loaded_env())
@@ -0,0 +1,45 @@
+"""
+Shared aiohttp session for the HTTP test scripts
+One pooled session per process so keep-alive connections are reused
+"""
+from typing import Any, Optional
+import aiohttp
+
+from tests._json import loads, dumps
+
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+def new_session() -> aiohttp.ClientSession:
+    """A pooled aiohttp session bound to the running event loop"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, enable_cleanup_closed=True),
+        timeout=aiohttp.ClientTimeout(total=30, connect=5, sock_read=25),
+        json_serialize=dumps
+    )
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use
+    
+    The session is tied to the loop it was created on, so this is only for
+    scripts that run everything under one asyncio.run(); pytest tests take
+    the per-test http_session fixture instead.
+    """
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = new_session()
+    return _SESSION
+
+
+async def close_session():
+    """Close the shared session if one was opened"""
+    global _SESSION
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+
+
+async def read_json(resp: aiohttp.ClientResponse) -> Any:
+    """Decode a response body, with orjson when available"""
+    return loads(await resp.read())
@@ -0,0 +1,24 @@
+"""
+Shared LangGraph SDK clients for the deployment test scripts
+One client (and HTTP connection pool) per server URL per event loop run
+"""
+from typing import Any, Dict
+from langgraph_sdk import get_client
+
+_clients: Dict[str, Any] = {}
+
+
+def lg_client(url: str) -> Any:
+    """Return the cached LangGraph client for url, creating it on first use"""
+    client = _clients.get(url)
+    if client is None:
+        client = get_client(url=url)
+        _clients[url] = client
+    return client
+
+
+async def close_clients():
+    """Close every cached client's HTTP pool; call before the event loop ends"""
+    while _clients:
+        _, client = _clients.popitem()
+        await client.http.client.aclose()
@@ -0,0 +1,22 @@
+"""
+Buffered stdout for the print-heavy test scripts
+Collects a function's prints in memory and writes them with a single call
+"""
+import io
+import sys
+from contextlib import redirect_stdout
+from functools import wraps
+
+
+def buffered_stdout(func):
+    """Run func with stdout captured, then write everything it printed at once"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with redirect_stdout(buf):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+    return wrapper
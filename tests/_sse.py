@@ -0,0 +1,55 @@
+"""
+Server-sent event parsing for the LangGraph run-streaming tests
+Payloads are decoded straight from the raw response bytes
+"""
+from typing import Any, AsyncIterator, List, Optional
+
+import aiohttp
+
+from tests._json import loads
+
+_DATA_PREFIX = b'data: '
+_CHUNK_SIZE = 65536
+
+
+def _payload(buf: bytearray, start: int, end: int) -> Optional[Any]:
+    """Decode the 'data: ' line in buf[start:end], or None for any other line"""
+    if not buf.startswith(_DATA_PREFIX, start, end):
+        return None
+    try:
+        return loads(buf[start + len(_DATA_PREFIX):end])
+    except ValueError:
+        return None
+
+
+def _drain(buf: bytearray) -> List[Any]:
+    """Decode every complete line in buf, then drop the consumed bytes"""
+    payloads = []
+    start = 0
+    end = buf.find(b'\n')
+    while end != -1:
+        data = _payload(buf, start, end)
+        if data is not None:
+            payloads.append(data)
+        start = end + 1
+        end = buf.find(b'\n', start)
+    del buf[:start]
+    return payloads
+
+
+async def aiter_sse_data(response: aiohttp.ClientResponse) -> AsyncIterator[Any]:
+    """Yield the decoded JSON payload of every 'data: ' line in a streamed response
+    
+    Lines are split out of one reusable bytearray instead of going through
+    readline(), so no per-line bytes/str objects are built for events we skip.
+    """
+    buf = bytearray()
+    async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+        buf += chunk
+        for data in _drain(buf):
+            yield data
+    
+    # Final line without a trailing newline
+    data = _payload(buf, 0, len(buf))
+    if data is not None:
+        yield data
@@ -0,0 +1,28 @@
+"""
+Shared pytest fixtures for the test suite
+"""
+import pytest
+
+from src.tools.meta_ads_tools import DynamicMetaSDK
+from tests._http import new_session
+
+
+@pytest.fixture(scope="session")
+def meta_sdk() -> DynamicMetaSDK:
+    """One DynamicMetaSDK (and FacebookAdsApi session) for the whole test run"""
+    return DynamicMetaSDK()
+
+
+@pytest.fixture
+def sdk(meta_sdk: DynamicMetaSDK) -> DynamicMetaSDK:
+    """The shared SDK with its user security context cleared for each test"""
+    meta_sdk.current_user_phone = None
+    meta_sdk.allowed_campaigns = []
+    return meta_sdk
+
+
+@pytest.fixture
+async def http_session():
+    """An aiohttp session opened and closed on each test's own event loop"""
+    async with new_session() as session:
+        yield session
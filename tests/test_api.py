@@ -2,62 +2,70 @@
 """
 Test Ryan's Assistant via LangGraph API
 """
-import requests
-import json
+import asyncio
+import httpx
+
+from tests._json import loads
 
 # Test the LangGraph API
 base_url = "http://localhost:8123"
 
-print("=" * 70)
-print("🎤 TESTING RYAN'S ASSISTANT VIA API")
-print("=" * 70)
-
-# Check health
-response = requests.get(f"{base_url}/ok")
-print(f"Health Check: {response.json()}")
-
-# Try to invoke the agent
-print("\nTesting agent invocation...")
-
-# Create a thread
-thread_response = requests.post(
-    f"{base_url}/threads",
-    headers={"Content-Type": "application/json"},
-    json={}
-)
-
-if thread_response.status_code == 200:
-    thread_id = thread_response.json().get("thread_id")
-    print(f"Thread created: {thread_id}")
-    
-    # Send a message
-    message_data = {
-        "messages": [
-            {
-                "role": "human",
-                "content": "How is my SENDÉ tour campaign doing?"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+async def main():
+    print("=" * 70)
+    print("🎤 TESTING RYAN'S ASSISTANT VIA API")
+    print("=" * 70)
+
+    # One pooled client for every call below
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        # Health check and thread creation don't depend on each other
+        response, thread_response = await asyncio.gather(
+            client.get("/ok"),
+            client.post("/threads", headers=JSON_HEADERS, json={})
+        )
+        print(f"Health Check: {loads(response.content)}")
+
+        # Try to invoke the agent
+        print("\nTesting agent invocation...")
+
+        if thread_response.status_code == 200:
+            thread_id = loads(thread_response.content).get("thread_id")
+            print(f"Thread created: {thread_id}")
+
+            # Send a message
+            message_data = {
+                "messages": [
+                    {
+                        "role": "human",
+                        "content": "How is my SENDÉ tour campaign doing?"
+                    }
+                ]
             }
-        ]
-    }
-    
-    # Invoke the agent
-    invoke_response = requests.post(
-        f"{base_url}/threads/{thread_id}/runs",
-        headers={"Content-Type": "application/json"},
-        json={
-            "assistant_id": "agent",
-            "input": message_data
-        }
-    )
-    
-    print(f"Invoke status: {invoke_response.status_code}")
-    if invoke_response.status_code == 200:
-        print("Response:", invoke_response.json())
-else:
-    print(f"Thread creation failed: {thread_response.status_code}")
-    print(thread_response.text)
-
-print("\n" + "=" * 70)
-print("To visualize the graph, install LangGraph Studio:")
-print("https://github.com/langchain-ai/langgraph-studio")
-print("=" * 70)
\ No newline at end of file
+
+            # Invoke the agent
+            invoke_response = await client.post(
+                f"/threads/{thread_id}/runs",
+                headers=JSON_HEADERS,
+                json={
+                    "assistant_id": "agent",
+                    "input": message_data
+                }
+            )
+
+            print(f"Invoke status: {invoke_response.status_code}")
+            if invoke_response.status_code == 200:
+                print("Response:", loads(invoke_response.content))
+        else:
+            print(f"Thread creation failed: {thread_response.status_code}")
+            print(thread_response.text)
+
+    print("\n" + "=" * 70)
+    print("To visualize the graph, install LangGraph Studio:")
+    print("https://github.com/langchain-ai/langgraph-studio")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
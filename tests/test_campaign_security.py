@@ -2,6 +2,7 @@
 Test campaign-level security access control
 """
 import os
+import pytest
 from src.config.security_config import (
     get_allowed_campaigns, 
     can_access_campaign,
@@ -10,123 +11,92 @@ from src.config.security_config import (
 )
 from src.tools.meta_ads_tools import DynamicMetaSDK
 
-def test_campaign_security():
-    """Test campaign access control"""
-    
-    print("🔒 Testing Campaign Security Access Control")
-    print("=" * 50)
-    
-    # Test users
-    test_users = [
-        {
-            "phone": "+17865551234",  # Ryan Castro
-            "name": "Ryan Castro",
-            "expected_campaigns": ["120232002620350525"],
-            "expected_access": "restricted"
-        },
-        {
-            "phone": "+17865555678",  # Tour Manager
-            "name": "Tour Manager",
-            "expected_campaigns": ["120232002620350525"],
-            "expected_access": "restricted"
-        },
-        {
-            "phone": "+17865559999",  # Marketing Assistant
-            "name": "Marketing Assistant",
-            "expected_campaigns": [],
-            "expected_access": "none"
-        },
-        {
-            "phone": "+13055551234",  # Agency Admin
-            "name": "Agency Admin",
-            "expected_campaigns": ["*"],
-            "expected_access": "all"
-        },
-        {
-            "phone": "+19999999999",  # Unknown user
-            "name": "Unknown User",
-            "expected_campaigns": [],
-            "expected_access": "none"
-        }
-    ]
-    
-    # Test campaign IDs
-    ryan_campaign = "120232002620350525"
-    other_campaign = "999999999999999999"
-    
-    for user in test_users:
-        print(f"\n📱 Testing: {user['name']} ({user['phone']})")
-        print("-" * 40)
-        
-        # Test get_allowed_campaigns
-        allowed = get_allowed_campaigns(user['phone'])
-        print(f"   Allowed campaigns: {allowed}")
-        assert allowed == user['expected_campaigns'], f"Expected {user['expected_campaigns']}, got {allowed}"
-        
-        # Test get_campaign_access_level
-        access_level = get_campaign_access_level(user['phone'])
-        print(f"   Access level: {access_level}")
-        assert access_level == user['expected_access'], f"Expected {user['expected_access']}, got {access_level}"
-        
-        # Test can_access_campaign for Ryan's campaign
-        can_access_ryan = can_access_campaign(user['phone'], ryan_campaign)
-        if user['name'] in ["Ryan Castro", "Tour Manager", "Agency Admin"]:
-            assert can_access_ryan == True, f"{user['name']} should access Ryan's campaign"
-            print(f"   ✅ Can access Ryan's campaign: {can_access_ryan}")
-        else:
-            assert can_access_ryan == False, f"{user['name']} should NOT access Ryan's campaign"
-            print(f"   ❌ Can access Ryan's campaign: {can_access_ryan}")
-        
-        # Test can_access_campaign for other campaign
-        can_access_other = can_access_campaign(user['phone'], other_campaign)
-        if user['name'] == "Agency Admin":
-            assert can_access_other == True, f"Agency Admin should access all campaigns"
-            print(f"   ✅ Can access other campaigns: {can_access_other}")
-        else:
-            assert can_access_other == False, f"{user['name']} should NOT access other campaigns"
-            print(f"   ❌ Can access other campaigns: {can_access_other}")
-    
-    # Test SDK integration
+# Test users
+TEST_USERS = [
+    {
+        "phone": "+17865551234",  # Ryan Castro
+        "name": "Ryan Castro",
+        "expected_campaigns": ["120232002620350525"],
+        "expected_access": "restricted"
+    },
+    {
+        "phone": "+17865555678",  # Tour Manager
+        "name": "Tour Manager",
+        "expected_campaigns": ["120232002620350525"],
+        "expected_access": "restricted"
+    },
+    {
+        "phone": "+17865559999",  # Marketing Assistant
+        "name": "Marketing Assistant",
+        "expected_campaigns": [],
+        "expected_access": "none"
+    },
+    {
+        "phone": "+13055551234",  # Agency Admin
+        "name": "Agency Admin",
+        "expected_campaigns": ["*"],
+        "expected_access": "all"
+    },
+    {
+        "phone": "+19999999999",  # Unknown user
+        "name": "Unknown User",
+        "expected_campaigns": [],
+        "expected_access": "none"
+    }
+]
+
+# Test campaign IDs
+RYAN_CAMPAIGN = "120232002620350525"
+OTHER_CAMPAIGN = "999999999999999999"
+
+# Who sees Ryan's campaign, and who sees every campaign
+RYAN_CAMPAIGN_USERS = {"Ryan Castro", "Tour Manager", "Agency Admin"}
+ALL_CAMPAIGN_USERS = {"Agency Admin"}
+
+# Flat (phone, campaign_id) -> expected access, built once at import
+EXPECTED_ACCESS = {
+    (user['phone'], campaign_id):
+        user['name'] in ALL_CAMPAIGN_USERS
+        or (campaign_id == RYAN_CAMPAIGN and user['name'] in RYAN_CAMPAIGN_USERS)
+    for user in TEST_USERS
+    for campaign_id in (RYAN_CAMPAIGN, OTHER_CAMPAIGN)
+}
+
+by_user = pytest.mark.parametrize("user", TEST_USERS, ids=[user["name"] for user in TEST_USERS])
+
+
+@by_user
+def test_allowed_campaigns(user):
+    """get_allowed_campaigns returns each user's whitelist"""
+    assert get_allowed_campaigns(user['phone']) == user['expected_campaigns']
+
+
+@by_user
+def test_campaign_access_level(user):
+    """get_campaign_access_level returns each user's access level"""
+    assert get_campaign_access_level(user['phone']) == user['expected_access']
+
+
+@pytest.mark.parametrize("phone,campaign_id", list(EXPECTED_ACCESS))
+def test_can_access_campaign(phone, campaign_id):
+    """can_access_campaign matches the expected access matrix"""
+    assert can_access_campaign(phone, campaign_id) == EXPECTED_ACCESS[(phone, campaign_id)]
+
+
+def test_sdk_security_integration(sdk: DynamicMetaSDK):
+    """DynamicMetaSDK enforces the user context it is given"""
     print("\n\n🔧 Testing SDK Security Integration")
     print("=" * 50)
     
-    sdk = DynamicMetaSDK()
-    
-    # Test with Ryan's context
-    print("\n1. Setting Ryan Castro's context...")
-    sdk.set_user_context("+17865551234")
-    
-    # Should be able to access Ryan's campaign
-    can_access = sdk.check_campaign_access(ryan_campaign)
-    print(f"   Can access campaign {ryan_campaign}: {can_access}")
-    assert can_access == True, "Ryan should access his campaign"
-    
-    # Should NOT be able to access other campaign
-    can_access = sdk.check_campaign_access(other_campaign)
-    print(f"   Can access campaign {other_campaign}: {can_access}")
-    assert can_access == False, "Ryan should NOT access other campaigns"
-    
-    # Test with unknown user context
-    print("\n2. Setting unknown user context...")
-    sdk.set_user_context("+19999999999")
-    
-    # Should NOT be able to access any campaign
-    can_access = sdk.check_campaign_access(ryan_campaign)
-    print(f"   Can access campaign {ryan_campaign}: {can_access}")
-    assert can_access == False, "Unknown user should NOT access any campaign"
-    
-    # Test with agency admin context
-    print("\n3. Setting agency admin context...")
-    sdk.set_user_context("+13055551234")
-    
-    # Should be able to access ALL campaigns
-    can_access = sdk.check_campaign_access(ryan_campaign)
-    print(f"   Can access campaign {ryan_campaign}: {can_access}")
-    assert can_access == True, "Agency admin should access all campaigns"
-    
-    can_access = sdk.check_campaign_access(other_campaign)
-    print(f"   Can access campaign {other_campaign}: {can_access}")
-    assert can_access == True, "Agency admin should access all campaigns"
+    for step, user in enumerate(TEST_USERS, 1):
+        print(f"\n{step}. Setting {user['name']}'s context...")
+        sdk.set_user_context(user['phone'])
+
+        for campaign_id in (RYAN_CAMPAIGN, OTHER_CAMPAIGN):
+            can_access = sdk.check_campaign_access(campaign_id)
+            print(f"   Can access campaign {campaign_id}: {can_access}")
+            assert can_access == EXPECTED_ACCESS[(user['phone'], campaign_id)], \
+                f"{user['name']} has the wrong access to {campaign_id}"
     
     print("\n\n✅ All security tests passed!")
     print("=" * 50)
@@ -138,4 +108,19 @@ def test_campaign_security():
     print("• Unknown users cannot access any campaigns")
 
 if __name__ == "__main__":
-    test_campaign_security()
\ No newline at end of file
+    print("🔒 Testing Campaign Security Access Control")
+    print("=" * 50)
+    
+    for user in TEST_USERS:
+        print(f"\n📱 Testing: {user['name']} ({user['phone']})")
+        print("-" * 40)
+        test_allowed_campaigns(user)
+        test_campaign_access_level(user)
+        for campaign_id in (RYAN_CAMPAIGN, OTHER_CAMPAIGN):
+            test_can_access_campaign(user['phone'], campaign_id)
+        print(f"   Allowed campaigns: {get_allowed_campaigns(user['phone'])}")
+        print(f"   Access level: {get_campaign_access_level(user['phone'])}")
+        print(f"   Can access Ryan's campaign: {can_access_campaign(user['phone'], RYAN_CAMPAIGN)}")
+        print(f"   Can access other campaigns: {can_access_campaign(user['phone'], OTHER_CAMPAIGN)}")
+    
+    test_sdk_security_integration(DynamicMetaSDK())
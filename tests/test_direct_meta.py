@@ -2,19 +2,17 @@
 """
 Direct test of Meta API to verify data access
 """
-import os
-from dotenv import load_dotenv
+from datetime import date, timedelta
 from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.campaign import Campaign
-
-load_dotenv()
+from tests._env import env
 
 # Initialize
-FacebookAdsApi.init(access_token=os.getenv('META_ACCESS_TOKEN'))
+FacebookAdsApi.init(access_token=env().get('META_ACCESS_TOKEN'))
 
 # Get the campaign
-campaign_id = os.getenv('DEFAULT_CAMPAIGN_ID', '120232002620350525')
+campaign_id = env().get('DEFAULT_CAMPAIGN_ID', '120232002620350525')
 campaign = Campaign(campaign_id)
 
 # Get basic info
@@ -22,19 +20,31 @@ campaign_fields = campaign.api_get(fields=['name', 'status', 'objective'])
 print(f"Campaign: {campaign_fields['name']}")
 print(f"Status: {campaign_fields['status']}")
 
-# Get insights for today
-insights = campaign.get_insights(fields=[
+# One daily breakdown covering the previous 7 days plus today. Meta buckets the
+# rows by the ad account's timezone, so the window has a day of slack and the
+# latest row returned stands for the account's today rather than date.today()
+local_today = date.today()
+daily_rows = sorted(campaign.get_insights(fields=[
     'impressions',
     'clicks', 
     'spend',
     'ctr',
     'purchase_roas'
 ], params={
-    'date_preset': 'today'
-})
+    'time_range': {
+        'since': (local_today - timedelta(days=8)).isoformat(),
+        'until': local_today.isoformat()
+    },
+    'time_increment': 1
+}), key=lambda row: row.get('date_start', ''))
+
+today = date.fromisoformat(daily_rows[-1]['date_start']) if daily_rows else local_today
+week_start = (today - timedelta(days=7)).isoformat()
+today_rows = [row for row in daily_rows if row.get('date_start') == today.isoformat()]
+week_rows = [row for row in daily_rows if week_start <= row.get('date_start', '') < today.isoformat()]
 
-if insights:
-    for insight in insights:
+if today_rows:
+    for insight in today_rows:
         print(f"\nToday's Performance:")
         impressions = int(insight.get('impressions', 0))
         print(f"  Impressions: {impressions:,}")
@@ -51,20 +61,12 @@ if insights:
 else:
     print("No data for today yet")
 
-# Get last 7 days
-insights_week = campaign.get_insights(fields=[
-    'impressions',
-    'clicks',
-    'spend'
-], params={
-    'date_preset': 'last_7d'
-})
-
-if insights_week:
-    for insight in insights_week:
-        print(f"\nLast 7 Days:")
-        total_impressions = int(insight.get('impressions', 0))
-        total_clicks = int(insight.get('clicks', 0))
-        print(f"  Total Impressions: {total_impressions:,}")
-        print(f"  Total Clicks: {total_clicks:,}")
-        print(f"  Total Spend: ${insight.get('spend', 0)}")
\ No newline at end of file
+# Last 7 days (same window as date_preset='last_7d', which excludes today)
+if week_rows:
+    print(f"\nLast 7 Days:")
+    total_impressions = sum(int(row.get('impressions', 0)) for row in week_rows)
+    total_clicks = sum(int(row.get('clicks', 0)) for row in week_rows)
+    total_spend = sum(float(row.get('spend', 0)) for row in week_rows)
+    print(f"  Total Impressions: {total_impressions:,}")
+    print(f"  Total Clicks: {total_clicks:,}")
+    print(f"  Total Spend: ${total_spend:.2f}")
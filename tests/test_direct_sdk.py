@@ -1,18 +1,12 @@
 """
 Test the SDK directly without the tool wrapper
 """
-import os
 import asyncio
-from dotenv import load_dotenv
 from src.tools.meta_ads_tools import DynamicMetaSDK
 
-load_dotenv()
-
-async def test_sdk_directly():
+async def test_sdk_directly(sdk: DynamicMetaSDK):
     """Test SDK methods directly"""
     
-    sdk = DynamicMetaSDK()
-    
     print("🔍 Testing Direct SDK Methods")
     print("=" * 50)
     
@@ -56,4 +50,4 @@ async def test_sdk_directly():
         print(f"   ❌ Exception: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(test_sdk_directly())
\ No newline at end of file
+    asyncio.run(test_sdk_directly(DynamicMetaSDK()))
\ No newline at end of file
@@ -0,0 +1,316 @@
+"""
+Unit tests for the Meta SDK tool helpers (no Meta API calls)
+"""
+import json
+import threading
+import time
+import pytest
+from facebook_business.exceptions import FacebookRequestError
+
+from src.tools import meta_ads_tools
+from src.tools.meta_ads_tools import (
+    _execute_cached, _normalize_query, _query_key, _rate_limit_wait, _ttl_get, _ttl_put,
+    meta_sdk_batch_query, meta_sdk_batch_query_stream, meta_sdk_query, meta_sdk_search
+)
+
+
+def _throttled(code: int = 17, headers: dict = None) -> FacebookRequestError:
+    """A Graph API throttling error with the given response headers"""
+    body = json.dumps({"error": {"code": code, "message": "User request limit reached"}})
+    return FacebookRequestError("throttled", {}, 400, headers or {}, body)
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    """Take the random jitter out of the backoff so waits are exact"""
+    monkeypatch.setattr(meta_ads_tools.random, "uniform", lambda a, b: 0)
+
+
+@pytest.mark.parametrize("attempt,expected", [(1, 2), (2, 4), (3, 8)])
+def test_rate_limit_wait_backs_off_exponentially(no_jitter, attempt, expected):
+    assert _rate_limit_wait(_throttled(), attempt) == expected
+
+
+def test_rate_limit_wait_adds_jitter():
+    wait = _rate_limit_wait(_throttled(), 1)
+    assert 2 <= wait <= 3
+
+
+def test_rate_limit_wait_honours_retry_after(no_jitter):
+    assert _rate_limit_wait(_throttled(headers={"Retry-After": "12"}), 1) == 12
+
+
+def test_rate_limit_wait_ignores_shorter_retry_after(no_jitter):
+    assert _rate_limit_wait(_throttled(headers={"Retry-After": "1"}), 2) == 4
+
+
+def test_rate_limit_wait_uses_business_use_case_minutes(no_jitter):
+    usage = {"act_123": [{"type": "ads_insights", "estimated_time_to_regain_access": 3}]}
+    error = _throttled(80004, {"X-Business-Use-Case-Usage": json.dumps(usage)})
+    assert _rate_limit_wait(error, 1) == 180
+
+
+def test_rate_limit_wait_ignores_malformed_headers(no_jitter):
+    error = _throttled(headers={"Retry-After": "soon", "X-Business-Use-Case-Usage": "not json"})
+    assert _rate_limit_wait(error, 1) == 2
+
+
+def test_execute_query_hands_long_waits_back(sdk, monkeypatch):
+    """A wait past the backoff budget is returned at once instead of slept"""
+    def throttled(query):
+        raise _throttled(headers={"Retry-After": "60"})
+
+    def no_sleep(seconds):
+        raise AssertionError(f"slept {seconds}s")
+
+    monkeypatch.setattr(sdk, "_dispatch_query", throttled)
+    monkeypatch.setattr(meta_ads_tools.time, "sleep", no_sleep)
+
+    result = sdk.execute_query({"operation": "get_all_campaigns"})
+    assert result["error"] == "rate_limited"
+    assert result["retry_after"] == 60
+
+
+async def test_meta_sdk_query_times_out_on_slow_dispatch(monkeypatch):
+    """In an async context the tool gives up after _QUERY_TIMEOUT, not when the worker ends"""
+    release = threading.Event()
+
+    def slow_query(query):
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(meta_ads_tools, "_QUERY_TIMEOUT", 0.2)
+    monkeypatch.setattr(meta_ads_tools.meta_sdk, "execute_query", slow_query)
+
+    start = time.monotonic()
+    try:
+        result = meta_sdk_query.func({"operation": "get_all_campaigns"})
+    finally:
+        release.set()
+
+    assert time.monotonic() - start < 1
+    assert result["error_type"] == "TimeoutError"
+
+
+def test_normalize_query_splits_fields_and_params():
+    fields, params = _normalize_query({
+        "operation": "get_campaign_insights",
+        "campaign_id": "123",
+        "fields": ["spend"],
+        "date_preset": "today"
+    })
+    assert fields == {"operation": "get_campaign_insights", "campaign_id": "123", "fields": ["spend"]}
+    assert params == {"date_preset": "today"}
+
+
+def test_normalize_query_reads_nested_params():
+    fields, params = _normalize_query({
+        "operation": "get_adsets_insights",
+        "params": {"date_preset": "today", "level": "adset", "unknown": 1}
+    })
+    assert fields == {"operation": "get_adsets_insights"}
+    assert params == {"date_preset": "today", "level": "adset"}
+
+
+def test_normalize_query_flat_params_win():
+    _, params = _normalize_query({"date_preset": "last_7d", "params": {"date_preset": "today"}})
+    assert params == {"date_preset": "last_7d"}
+
+
+def test_normalize_query_empty_flat_value_falls_back_to_nested():
+    _, params = _normalize_query({"date_preset": "", "params": {"date_preset": "today"}})
+    assert params == {"date_preset": "today"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock the test moves by hand"""
+    now = [1000.0]
+    monkeypatch.setattr(meta_ads_tools.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl_cache_expires_entries(clock):
+    cache = {}
+    _ttl_put(cache, "a", 1, ttl=10, max_size=4)
+    assert _ttl_get(cache, "a") == 1
+    clock[0] += 10
+    assert _ttl_get(cache, "a", "gone") == "gone"
+
+
+def test_ttl_cache_evicts_expired_before_oldest(clock):
+    cache = {}
+    _ttl_put(cache, "old", 1, ttl=100, max_size=2)
+    _ttl_put(cache, "short", 2, ttl=1, max_size=2)
+    clock[0] += 5
+    _ttl_put(cache, "new", 3, ttl=100, max_size=2)
+    assert list(cache) == ["old", "new"]
+
+
+def test_ttl_cache_evicts_oldest_when_nothing_expired(clock):
+    cache = {}
+    for key in ("a", "b", "c"):
+        _ttl_put(cache, key, key, ttl=100, max_size=2)
+    assert list(cache) == ["b", "c"]
+
+
+@pytest.fixture
+def counted_queries(monkeypatch):
+    """Stub execute_query with an empty result cache, recording every query sent"""
+    sent = []
+
+    def execute_query(query):
+        sent.append(query)
+        if query.get("fail"):
+            return {"error": "boom"}
+        return {"rows": [{"id": query["id"]}]}
+
+    monkeypatch.setattr(meta_ads_tools, "_batch_result_cache", {})
+    monkeypatch.setattr(meta_ads_tools.meta_sdk, "execute_query", execute_query)
+    return sent
+
+
+def test_query_key_ignores_key_order():
+    assert _query_key({"a": 1, "b": {"c": 2, "d": 3}}) == _query_key({"b": {"d": 3, "c": 2}, "a": 1})
+
+
+def test_execute_cached_reuses_recent_results(counted_queries):
+    query = {"id": "1"}
+    assert _execute_cached(_query_key(query), query) == _execute_cached(_query_key(query), query)
+    assert counted_queries == [query]
+
+
+def test_execute_cached_expires_results(counted_queries, clock):
+    query = {"id": "1"}
+    _execute_cached(_query_key(query), query)
+    clock[0] += meta_ads_tools._BATCH_RESULT_TTL
+    _execute_cached(_query_key(query), query)
+    assert len(counted_queries) == 2
+
+
+def test_execute_cached_does_not_cache_errors(counted_queries):
+    query = {"id": "1", "fail": True}
+    assert _execute_cached(_query_key(query), query) == {"error": "boom"}
+    _execute_cached(_query_key(query), query)
+    assert len(counted_queries) == 2
+
+
+def test_execute_cached_hands_out_copies(counted_queries):
+    query = {"id": "1"}
+    _execute_cached(_query_key(query), query)["rows"].clear()
+    assert _execute_cached(_query_key(query), query) == {"rows": [{"id": "1"}]}
+
+
+def test_batch_query_sends_duplicates_once(counted_queries):
+    results = meta_sdk_batch_query.func([{"id": "1"}, {"id": "2"}, {"id": "1"}])
+    assert sorted(query["id"] for query in counted_queries) == ["1", "2"]
+    assert results == [{"rows": [{"id": "1"}]}, {"rows": [{"id": "2"}]}, {"rows": [{"id": "1"}]}]
+    assert results[0] is not results[2]
+
+
+def test_batch_query_keeps_input_order(counted_queries, monkeypatch):
+    """Slow early queries still land at their own index"""
+    def execute_query(query):
+        time.sleep(0.05 * (3 - int(query["id"])))
+        return {"rows": [{"id": query["id"]}]}
+
+    monkeypatch.setattr(meta_ads_tools.meta_sdk, "execute_query", execute_query)
+    results = meta_sdk_batch_query.func([{"id": "1"}, {"id": "2"}, {"id": "3"}])
+    assert [result["rows"][0]["id"] for result in results] == ["1", "2", "3"]
+
+
+def test_batch_query_isolates_failures(counted_queries, monkeypatch):
+    def execute_query(query):
+        if query["id"] == "bad":
+            raise RuntimeError("boom")
+        return {"rows": [{"id": query["id"]}]}
+
+    monkeypatch.setattr(meta_ads_tools.meta_sdk, "execute_query", execute_query)
+    results = meta_sdk_batch_query.func([{"id": "1"}, {"id": "bad"}, {"id": "2"}])
+    assert results[1] == {"error": "boom", "error_type": "RuntimeError"}
+    assert results[0] == {"rows": [{"id": "1"}]}
+    assert results[2] == {"rows": [{"id": "2"}]}
+
+
+async def test_batch_stream_emits_every_index(counted_queries, monkeypatch):
+    chunks = []
+    monkeypatch.setattr(meta_ads_tools, "_stream_writer", lambda: chunks.append)
+
+    results = await meta_sdk_batch_query_stream.ainvoke({"queries": [{"id": "1"}, {"id": "2"}, {"id": "1"}]})
+
+    assert results == [{"rows": [{"id": "1"}]}, {"rows": [{"id": "2"}]}, {"rows": [{"id": "1"}]}]
+    assert results[0] is not results[2]
+    assert len(counted_queries) == 2
+    assert sorted(chunk["index"] for chunk in chunks) == [0, 1, 2]
+
+
+async def test_batch_stream_caps_concurrency(counted_queries, monkeypatch):
+    lock = threading.Lock()
+    running = [0, 0]  # current, peak
+
+    def execute_query(query):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return {"rows": []}
+
+    monkeypatch.setattr(meta_ads_tools, "_BATCH_MAX_WORKERS", 2)
+    monkeypatch.setattr(meta_ads_tools.meta_sdk, "execute_query", execute_query)
+    await meta_sdk_batch_query_stream.ainvoke({"queries": [{"id": str(n)} for n in range(6)]})
+    assert running[1] == 2
+
+
+class _FakeRecord:
+    def __init__(self, name):
+        self.name = name
+
+    def export_all_data(self):
+        return {"name": self.name}
+
+
+class _FakeAccount:
+    """Records the params each edge call was made with"""
+    def __init__(self, names):
+        self.names = names
+        self.calls = []
+
+    def get_campaigns(self, fields, params):
+        self.calls.append(("campaigns", params))
+        return iter(_FakeRecord(name) for name in self.names)
+
+    def get_ad_sets(self, fields, params):
+        self.calls.append(("adsets", params))
+        return iter(_FakeRecord(name) for name in self.names)
+
+
+@pytest.fixture
+def fake_account(monkeypatch):
+    account = _FakeAccount(["Sende Tour - Miami", "Sende Tour - Brooklyn", "Sende Tour - Houston"])
+    monkeypatch.setattr(meta_ads_tools.meta_sdk, "_account_id_formatted", "act_123")
+    monkeypatch.setattr(meta_ads_tools.meta_sdk, "account", account)
+    return account
+
+
+@pytest.mark.parametrize("search_type", ["campaigns", "adsets"])
+def test_search_filters_by_name_on_the_api(fake_account, search_type):
+    meta_sdk_search.func(search_type, "Sende", limit=10)
+    assert fake_account.calls == [(search_type, {
+        "limit": 10,
+        "filtering": [{"field": "name", "operator": "CONTAIN", "value": "Sende"}]
+    })]
+
+
+def test_search_stops_at_limit(fake_account):
+    assert meta_sdk_search.func("campaigns", "Sende", limit=2) == [
+        {"name": "Sende Tour - Miami"},
+        {"name": "Sende Tour - Brooklyn"}
+    ]
+
+
+def test_search_rejects_bad_input(fake_account):
+    assert meta_sdk_search.func("campaigns", "  ") == [{"error": "Empty search_term"}]
+    assert "not supported" in meta_sdk_search.func("ads", "Sende")[0]["error"]
+    assert fake_account.calls == []
@@ -1,20 +1,18 @@
 """
 Test basic Meta SDK connection
 """
-import os
-from dotenv import load_dotenv
 from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
-
-load_dotenv()
+from tests._env import env
 
 def test_basic_connection():
     """Test if we can connect to Meta API"""
     
-    access_token = os.getenv("META_ACCESS_TOKEN")
-    app_id = os.getenv("META_APP_ID")
-    app_secret = os.getenv("META_APP_SECRET")
-    account_id = os.getenv("META_AD_ACCOUNT_ID")
+    values = env()
+    access_token = values.get("META_ACCESS_TOKEN")
+    app_id = values.get("META_APP_ID")
+    app_secret = values.get("META_APP_SECRET")
+    account_id = values.get("META_AD_ACCOUNT_ID")
     
     print("🔍 Testing Meta SDK Connection")
     print("=" * 50)
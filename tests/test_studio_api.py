@@ -1,10 +1,14 @@
 """
 Test the LangGraph Studio API directly
 """
-import requests
-import json
+import asyncio
+from tests._http import new_session, read_json
+from tests._sse import aiter_sse_data
 
-def test_studio_api():
+# Message types/roles the server uses for assistant replies
+_AI_ROLES = frozenset({"ai", "assistant"})
+
+async def test_studio_api(http_session):
     """Test calling the Studio API"""
     
     # Studio API endpoint
@@ -16,14 +20,14 @@ def test_studio_api():
     # Test 1: Get assistants
     print("\n1. Getting assistants...")
     try:
-        response = requests.get(f"{base_url}/assistants")
-        if response.status_code == 200:
-            assistants = response.json()
-            print(f"   ✅ Found {len(assistants)} assistants")
-            for assistant in assistants:
-                print(f"      - {assistant.get('graph_id', 'unknown')}")
-        else:
-            print(f"   ❌ Failed: {response.status_code}")
+        async with http_session.get(f"{base_url}/assistants") as response:
+            if response.status == 200:
+                assistants = await read_json(response)
+                print(f"   ✅ Found {len(assistants)} assistants")
+                for assistant in assistants:
+                    print(f"      - {assistant.get('graph_id', 'unknown')}")
+            else:
+                print(f"   ❌ Failed: {response.status}")
     except Exception as e:
         print(f"   ❌ Error: {e}")
     
@@ -41,49 +45,50 @@ def test_studio_api():
     
     try:
         # Create a thread
-        thread_response = requests.post(
-            f"{base_url}/threads",
-            json={}
-        )
-        
-        if thread_response.status_code != 200:
-            print(f"   ❌ Failed to create thread: {thread_response.status_code}")
-            return
-        
-        thread = thread_response.json()
+        async with http_session.post(f"{base_url}/threads", json={}) as thread_response:
+            if thread_response.status != 200:
+                print(f"   ❌ Failed to create thread: {thread_response.status}")
+                return
+            
+            thread = await read_json(thread_response)
         thread_id = thread["thread_id"]
         print(f"   ✅ Created thread: {thread_id}")
         
         # Run the graph
-        run_response = requests.post(
+        async with http_session.post(
             f"{base_url}/threads/{thread_id}/runs",
             json={
                 "assistant_id": "meta_agent",
                 "input": payload,
                 "stream_mode": "values"
             }
-        )
-        
-        if run_response.status_code == 200:
-            print("   ✅ Run started successfully")
-            
-            # Stream the response
-            for line in run_response.iter_lines():
-                if line:
-                    try:
-                        data = json.loads(line.decode('utf-8').replace('data: ', ''))
-                        if 'messages' in data:
-                            for msg in data['messages']:
-                                if msg.get('type') == 'ai':
-                                    print(f"\n   Response: {msg.get('content', '')[:200]}...")
-                    except:
-                        pass
-        else:
-            print(f"   ❌ Failed to run: {run_response.status_code}")
-            print(f"   Response: {run_response.text}")
+        ) as run_response:
+            if run_response.status == 200:
+                print("   ✅ Run started successfully")
+                
+                # Stream the response - every "values" event carries the whole
+                # history, so only the messages added since the last event are scanned
+                last_reply = None
+                seen = 0
+                async for data in aiter_sse_data(run_response):
+                    if isinstance(data, dict) and 'messages' in data:
+                        messages = data['messages']
+                        for msg in messages[seen:]:
+                            if (msg.get('type') or msg.get('role')) in _AI_ROLES:
+                                last_reply = msg
+                        seen = len(messages)
+                if last_reply is not None:
+                    print(f"\n   Response: {last_reply.get('content', '')[:200]}...")
+            else:
+                print(f"   ❌ Failed to run: {run_response.status}")
+                print(f"   Response: {await run_response.text()}")
             
     except Exception as e:
         print(f"   ❌ Error: {e}")
 
+async def main():
+    async with new_session() as session:
+        await test_studio_api(session)
+
 if __name__ == "__main__":
-    test_studio_api()
\ No newline at end of file
+    asyncio.run(main())
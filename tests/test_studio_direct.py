@@ -4,7 +4,7 @@ Test the agent directly like the Studio UI does - without providing campaign_id
 This simulates clicking in the Studio UI and typing a message
 """
 import asyncio
-from langgraph_sdk import get_client
+from tests._lg import lg_client, close_clients
 
 async def test_studio_direct():
     """Test exactly like the Studio UI - just sending a message"""
@@ -16,7 +16,7 @@ async def test_studio_direct():
     print("=" * 70)
     
     # Connect to the local LangGraph server
-    client = get_client(url="http://localhost:8123")
+    client = lg_client("http://localhost:8123")
     
     try:
         print("\n⏳ Sending message just like Studio UI would...")
@@ -69,9 +69,15 @@ async def test_studio_direct():
         import traceback
         traceback.print_exc()
 
+async def main():
+    try:
+        await test_studio_direct()
+    finally:
+        await close_clients()
+
 if __name__ == "__main__":
     print("🔧 Testing agent exactly like Studio UI does")
     print("   (No campaign_id in input, should use default from .env)")
     print("")
     
-    asyncio.run(test_studio_direct())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -7,6 +7,31 @@ import os
 from langchain_core.messages import HumanMessage
 from src.agents.supervisor_agent import supervisor_agent
 
+# Test 1: With phone number (should work)
+TEST_STATE_WITH_PHONE = {
+    'messages': [HumanMessage(content='How is Miami campaign performing? What is the ROAS?')],
+    'phone_number': '+17865551234',  # Ryan's phone (admin)
+    'contact_id': 'test_contact_123'  # Simulate GHL contact
+}
+
+# Test 2: Without phone number (Studio default)
+TEST_STATE_NO_PHONE = {
+    'messages': [HumanMessage(content='How is Miami campaign performing?')]
+    # No phone_number - simulates Studio behavior
+}
+
+# Test 3: Unauthorized phone
+TEST_STATE_UNAUTHORIZED = {
+    'messages': [HumanMessage(content='Show me campaign data')],
+    'phone_number': '+19999999999'  # Not authorized
+}
+
+def _unwrap(result):
+    """Re-raise an exception captured by asyncio.gather, otherwise return the result"""
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
 async def test_studio_flow():
     """Test the flow as it runs in LangGraph Studio"""
     
@@ -14,18 +39,20 @@ async def test_studio_flow():
     print("🧪 TESTING LANGGRAPH STUDIO FLOW")
     print("="*70)
     
-    # Test 1: With phone number (should work)
+    # The three runs share no state, so they go to the agent concurrently and
+    # are reported in order afterwards
+    results = await asyncio.gather(
+        supervisor_agent.ainvoke(TEST_STATE_WITH_PHONE),
+        supervisor_agent.ainvoke(TEST_STATE_NO_PHONE),
+        supervisor_agent.ainvoke(TEST_STATE_UNAUTHORIZED),
+        return_exceptions=True
+    )
+    
     print("\n📋 Test 1: WITH phone number (Ryan Admin)")
     print("-"*50)
     
-    test_state_with_phone = {
-        'messages': [HumanMessage(content='How is Miami campaign performing? What is the ROAS?')],
-        'phone_number': '+17865551234',  # Ryan's phone (admin)
-        'contact_id': 'test_contact_123'  # Simulate GHL contact
-    }
-    
     try:
-        result = await supervisor_agent.ainvoke(test_state_with_phone)
+        result = _unwrap(results[0])
         
         print(f"✅ Security: {'PASSED' if result.get('is_authorized') else 'FAILED'}")
         if result.get('user_role'):
@@ -53,17 +80,11 @@ async def test_studio_flow():
     except Exception as e:
         print(f"❌ Error: {e}")
     
-    # Test 2: Without phone number (Studio default)
     print("\n📋 Test 2: WITHOUT phone number (Studio default)")
     print("-"*50)
     
-    test_state_no_phone = {
-        'messages': [HumanMessage(content='How is Miami campaign performing?')]
-        # No phone_number - simulates Studio behavior
-    }
-    
     try:
-        result = await supervisor_agent.ainvoke(test_state_no_phone)
+        result = _unwrap(results[1])
         
         print(f"✅ Security: {'BYPASSED (dev mode)' if result.get('is_authorized') else 'FAILED'}")
         if result.get('user_role'):
@@ -86,17 +107,11 @@ async def test_studio_flow():
     except Exception as e:
         print(f"❌ Error: {e}")
     
-    # Test 3: Unauthorized phone
     print("\n📋 Test 3: UNAUTHORIZED phone number")
     print("-"*50)
     
-    test_state_unauthorized = {
-        'messages': [HumanMessage(content='Show me campaign data')],
-        'phone_number': '+19999999999'  # Not authorized
-    }
-    
     try:
-        result = await supervisor_agent.ainvoke(test_state_unauthorized)
+        result = _unwrap(results[2])
         
         print(f"✅ Security: {'PASSED' if result.get('is_authorized') else 'BLOCKED'}")
         if result.get('error'):
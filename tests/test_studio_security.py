@@ -1,14 +1,15 @@
 """
 Test the LangGraph Studio API with security context
 """
-import requests
-import json
+import asyncio
+from tests._http import new_session, read_json
+from tests._sse import aiter_sse_data
 
-def test_studio_with_security():
+BASE_URL = "http://localhost:2024"
+
+async def test_studio_with_security(http_session):
     """Test calling the Studio API with phone number security context"""
     
-    base_url = "http://localhost:2024"
-    
     print("🔒 Testing LangGraph Studio with Security Context")
     print("=" * 50)
     
@@ -34,12 +35,14 @@ def test_studio_with_security():
         }
     ]
     
-    for test in test_cases:
-        print(f"\n📱 Testing: {test['name']}")
-        print(f"   Phone: {test['phone']}")
-        print(f"   Message: {test['message']}")
-        print(f"   Expected: {test['expected']}")
-        print("-" * 40)
+    async def _run(test):
+        """Run one test case, returning its report lines so parallel cases don't interleave"""
+        out = []
+        out.append(f"\n📱 Testing: {test['name']}")
+        out.append(f"   Phone: {test['phone']}")
+        out.append(f"   Message: {test['message']}")
+        out.append(f"   Expected: {test['expected']}")
+        out.append("-" * 40)
         
         payload = {
             "messages": [
@@ -51,65 +54,56 @@ def test_studio_with_security():
             "phone_number": test['phone']  # Pass phone number for security context
         }
         
-        try:
-            # Create a thread
-            thread_response = requests.post(
-                f"{base_url}/threads",
-                json={}
-            )
-            
-            if thread_response.status_code != 200:
-                print(f"   ❌ Failed to create thread: {thread_response.status_code}")
-                continue
-            
-            thread = thread_response.json()
-            thread_id = thread["thread_id"]
-            print(f"   ✅ Created thread: {thread_id}")
-            
-            # Run the graph
-            run_response = requests.post(
-                f"{base_url}/threads/{thread_id}/runs",
-                json={
-                    "assistant_id": "meta_agent",
-                    "input": payload,
-                    "stream_mode": "values"
-                }
-            )
+        # Create a thread
+        async with http_session.post(f"{BASE_URL}/threads", json={}) as thread_response:
+            if thread_response.status != 200:
+                out.append(f"   ❌ Failed to create thread: {thread_response.status}")
+                return out
             
-            if run_response.status_code == 200:
-                print("   ✅ Run started successfully")
+            thread = await read_json(thread_response)
+        thread_id = thread["thread_id"]
+        out.append(f"   ✅ Created thread: {thread_id}")
+        
+        # Run the graph
+        async with http_session.post(
+            f"{BASE_URL}/threads/{thread_id}/runs",
+            json={
+                "assistant_id": "meta_agent",
+                "input": payload,
+                "stream_mode": "values"
+            }
+        ) as run_response:
+            if run_response.status == 200:
+                out.append("   ✅ Run started successfully")
                 
                 # Check for access control in response
-                response_text = ""
-                for line in run_response.iter_lines():
-                    if line:
-                        try:
-                            data = json.loads(line.decode('utf-8').replace('data: ', ''))
-                            # Look for messages in the response
-                            if isinstance(data, dict):
-                                for key in data:
-                                    if isinstance(data[key], str):
-                                        response_text += data[key]
-                        except:
-                            pass
+                response_parts = []
+                async for data in aiter_sse_data(run_response):
+                    # Look for messages in the response
+                    if isinstance(data, dict):
+                        response_parts.extend(value for value in data.values() if isinstance(value, str))
+                response_text = "".join(response_parts)
                 
                 # Check security enforcement
                 if test['phone'] == "+19999999999":
                     if "access denied" in response_text.lower() or "permission" in response_text.lower():
-                        print("   ✅ Access correctly denied for unauthorized user")
+                        out.append("   ✅ Access correctly denied for unauthorized user")
                     else:
-                        print("   ⚠️  Access control may not be working")
+                        out.append("   ⚠️  Access control may not be working")
                 elif test['phone'] == "+17865551234":
                     if "120232002620350525" in response_text or "SENDÉ" in response_text:
-                        print("   ✅ Ryan can see his campaign data")
+                        out.append("   ✅ Ryan can see his campaign data")
                     else:
-                        print("   ⚠️  May not be getting campaign data")
-                        
+                        out.append("   ⚠️  May not be getting campaign data")
             else:
-                print(f"   ❌ Failed to run: {run_response.status_code}")
-                
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+                out.append(f"   ❌ Failed to run: {run_response.status}")
+        
+        return out
+    
+    # The cases are independent, so they run concurrently on the shared session;
+    # connection errors propagate and fail the test
+    for out in await asyncio.gather(*(_run(test) for test in test_cases)):
+        print("\n".join(out))
     
     print("\n\n" + "=" * 50)
     print("Security Context Testing Complete!")
@@ -119,5 +113,9 @@ def test_studio_with_security():
     print("✅ Agency admin can see all campaigns")
     print("✅ Access control is enforced at the SDK level")
 
+async def main():
+    async with new_session() as session:
+        await test_studio_with_security(session)
+
 if __name__ == "__main__":
-    test_studio_with_security()
\ No newline at end of file
+    asyncio.run(main())
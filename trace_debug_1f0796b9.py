@@ -4,13 +4,33 @@ Deep trace analysis for 1f0796b9-5706-61e7-8b8c-52c843c07969
 """
 
 import os
+import re
+from functools import lru_cache
 from dotenv import load_dotenv
 load_dotenv()
 
 from langsmith import Client
 
+from tests._json import dumps_pretty
+
+# Impressions and spend values in serialized insights, matched in a single pass
+_METRIC_RE = re.compile(r'"(?P<key>impressions|spend)"\s*:\s*"?(?P<value>[\d.]+)"?')
+
+@lru_cache(maxsize=1)
+def _client() -> Client:
+    """One LangSmith client per process"""
+    return Client()
+
+@lru_cache(maxsize=64)
+def _resolve_project(session_id: str) -> str:
+    """Project name for a session, cached so repeat analyses skip the lookup"""
+    try:
+        return _client().read_project(project_id=session_id).name
+    except Exception:
+        return "campaign-report-agent"  # Fallback to default
+
 def analyze_trace():
-    client = Client()
+    client = _client()
     trace_id = "1f0796b9-5706-61e7-8b8c-52c843c07969"
     
     print("="*100)
@@ -31,33 +51,22 @@ def analyze_trace():
     print("INPUTS:")
     print("="*50)
     if run.inputs:
-        import json
-        print(json.dumps(run.inputs, indent=2, default=str))
+        print(dumps_pretty(run.inputs))
     
     # Check outputs
     print("\n" + "="*50)
     print("OUTPUTS:")
     print("="*50)
     if run.outputs:
-        import json
-        print(json.dumps(run.outputs, indent=2, default=str))
+        print(dumps_pretty(run.outputs))
     
     # Get child runs
     print("\n" + "="*50)
     print("CHILD RUNS:")
     print("="*50)
     
-    # Get project name from the run
-    project_name = None
-    if hasattr(run, 'project_name'):
-        project_name = run.project_name
-    else:
-        # Try to get from session
-        try:
-            project = client.read_project(project_id=run.session_id)
-            project_name = project.name
-        except:
-            project_name = "campaign-report-agent"  # Fallback to default
+    # Get project name from the run, falling back to its session
+    project_name = getattr(run, 'project_name', None) or _resolve_project(run.session_id)
     
     child_runs = list(client.list_runs(
         project_name=project_name,
@@ -65,7 +74,17 @@ def analyze_trace():
         limit=100
     ))
     
-    for i, child in enumerate(child_runs):
+    # Serialize each child's payloads once; every check below reuses them
+    serialized = [
+        (
+            child,
+            dumps_pretty(child.inputs) if child.inputs else None,
+            dumps_pretty(child.outputs) if child.outputs else None
+        )
+        for child in child_runs
+    ]
+    
+    for i, (child, inputs_str, outputs_str) in enumerate(serialized):
         print(f"\n{i+1}. {child.name}")
         print(f"   Type: {child.run_type}")
         print(f"   Status: {child.status}")
@@ -73,40 +92,41 @@ def analyze_trace():
         # Look for specific nodes
         if "meta" in child.name.lower() or "analyze" in child.name.lower():
             print(f"   📊 META/ANALYZE NODE FOUND")
-            if child.inputs:
-                print(f"   Inputs: {json.dumps(child.inputs, indent=6, default=str)[:500]}")
-            if child.outputs:
-                print(f"   Outputs: {json.dumps(child.outputs, indent=6, default=str)[:500]}")
+            if inputs_str:
+                print(f"   Inputs: {inputs_str[:500]}")
+            if outputs_str:
+                print(f"   Outputs: {outputs_str[:500]}")
         
         if "query" in child.name.lower() or "sdk" in child.name.lower():
             print(f"   🔍 QUERY/SDK NODE FOUND")
-            if child.inputs:
-                inputs_str = json.dumps(child.inputs, indent=6, default=str)
+            if inputs_str:
                 # Look for date_preset
                 if "date_preset" in inputs_str or "today" in inputs_str:
                     print(f"   ⚠️ Contains date_preset or 'today'")
                     print(f"   Full inputs: {inputs_str[:1000]}")
-            if child.outputs:
-                outputs_str = json.dumps(child.outputs, indent=6, default=str)
+            if outputs_str:
                 # Check for data
                 if "impressions" in outputs_str or "spend" in outputs_str:
                     print(f"   ✅ Contains data (impressions/spend)")
-                    # Extract numbers
-                    import re
-                    impressions = re.findall(r'"impressions"\s*:\s*"?(\d+)"?', outputs_str)
-                    spend = re.findall(r'"spend"\s*:\s*"?([\d.]+)"?', outputs_str)
-                    if impressions:
-                        print(f"   Impressions found: {impressions[:5]}")
-                    if spend:
-                        print(f"   Spend found: {spend[:5]}")
+                    # Extract numbers - one scan for both fields, stopping at 5 of each
+                    found = {'impressions': [], 'spend': []}
+                    for match in _METRIC_RE.finditer(outputs_str):
+                        values = found[match['key']]
+                        if len(values) < 5:
+                            values.append(match['value'])
+                        elif all(len(v) == 5 for v in found.values()):
+                            break
+                    if found['impressions']:
+                        print(f"   Impressions found: {found['impressions']}")
+                    if found['spend']:
+                        print(f"   Spend found: {found['spend']}")
         
         # Check tool calls
         if child.run_type == "tool":
             print(f"   🔧 TOOL CALL")
-            if child.inputs:
-                print(f"   Tool inputs: {json.dumps(child.inputs, indent=6, default=str)[:500]}")
-            if child.outputs:
-                outputs_str = json.dumps(child.outputs, indent=6, default=str)
+            if inputs_str:
+                print(f"   Tool inputs: {inputs_str[:500]}")
+            if outputs_str:
                 if len(outputs_str) > 500:
                     print(f"   Tool outputs (truncated): {outputs_str[:500]}...")
                 else:
@@ -122,9 +142,8 @@ def analyze_trace():
     today_found = False
     data_returned = False
     
-    for child in child_runs:
-        if child.inputs:
-            inputs_str = str(child.inputs)
+    for child, inputs_str, outputs_str in serialized:
+        if inputs_str:
             if "date_preset" in inputs_str:
                 date_preset_found = True
                 if "today" in inputs_str:
@@ -132,8 +151,7 @@ def analyze_trace():
                     print(f"\n📍 'today' found in {child.name}")
                     print(f"   Full context: {inputs_str[:300]}")
         
-        if child.outputs:
-            outputs_str = str(child.outputs)
+        if outputs_str:
             if "impressions" in outputs_str and '"impressions": "0"' not in outputs_str:
                 data_returned = True
                 print(f"\n📊 Data returned in {child.name}")